@@ -1,13 +1,23 @@
 from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-import shutil
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import time
 import os
+import re
 import uuid
 import uvicorn
 import pathlib
 
+from worker_pool import RedactionWorkerPool, redactor
+from micro_batcher import MicroBatcher
+
 app = FastAPI()
 
 # Add CORS middleware to allow frontend requests
@@ -23,6 +33,195 @@ app.add_middleware(
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Upload streaming chunk size
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# CPU-bound redaction runs in long-lived worker processes that keep the models
+# loaded. Pending jobs are bounded so a burst of uploads gets a 503 instead of an
+# unbounded queue.
+REDACT_WORKERS = int(os.environ.get("CLARA_REDACT_WORKERS", "1"))
+REDACT_MAX_PENDING = int(os.environ.get("CLARA_REDACT_MAX_PENDING", "16"))
+worker_pool = RedactionWorkerPool(workers=REDACT_WORKERS)
+
+# /detect requests arriving within DETECT_MAX_WAIT_MS of each other share one nlp.pipe batch.
+# They run on their own warm worker(s) (NER only, no spelling/grammar engines), so a
+# detect batch never waits behind a whole-PDF redaction; CLARA_DETECT_WORKERS=0 shares
+# the redaction workers instead (one model in memory less, no latency isolation).
+DETECT_MAX_BATCH = int(os.environ.get("CLARA_DETECT_MAX_BATCH", "64"))
+DETECT_MAX_WAIT_MS = float(os.environ.get("CLARA_DETECT_MAX_WAIT_MS", "10"))
+DETECT_WORKERS = int(os.environ.get("CLARA_DETECT_WORKERS", "1"))
+detect_pool = (RedactionWorkerPool(workers=DETECT_WORKERS, no_spell=True, no_grammar=True)
+               if DETECT_WORKERS > 0 else worker_pool)
+detect_batcher = MicroBatcher(detect_pool, max_batch=DETECT_MAX_BATCH, max_wait_ms=DETECT_MAX_WAIT_MS)
+
+# ---------------- Async jobs ----------------
+
+# Share of the progress bar per pipeline stage (NER dominates with trf)
+STAGE_RANGES = {"extract": (0, 5), "correct": (5, 30), "ner": (30, 85), "write": (85, 95), "save": (95, 100)}
+# Finished jobs kept around for polling before the oldest are dropped
+JOB_RETENTION = int(os.environ.get("CLARA_JOB_RETENTION", "500"))
+SSE_KEEPALIVE_SECONDS = 15
+
+class Job:
+    def __init__(self, file_id: str, cache_key: str):
+        self.id = uuid.uuid4().hex
+        self.file_id = file_id
+        self.cache_key = cache_key
+        self.status = "queued"   # queued -> running -> done | error
+        self.stage = None
+        self.percent = 0
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.events = []
+        self.task = None
+        self._wake = asyncio.Event()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "error")
+
+    def snapshot(self):
+        return {
+            "job_id": self.id,
+            "file_id": self.file_id,
+            "status": self.status,
+            "stage": self.stage,
+            "percent": self.percent,
+            "result": self.result,
+            "error": self.error,
+        }
+
+    def publish(self, event_type, **data):
+        self.events.append((event_type, {"job_id": self.id, **data}))
+        # Wake every current listener, then arm a fresh event for the next update
+        self._wake.set()
+        self._wake = asyncio.Event()
+
+    def on_progress(self, stage, info):
+        self.status, self.stage = "running", stage
+        lo, hi = STAGE_RANGES.get(stage, (self.percent, self.percent))
+        frac = info.get("done", 0) / info["total"] if info.get("total") else 1.0
+        self.percent = max(self.percent, int(lo + (hi - lo) * frac))
+        self.publish("progress", stage=stage, percent=self.percent, **info)
+
+jobs: "OrderedDict[str, Job]" = OrderedDict()
+# cache_key -> unfinished Job, so identical concurrent requests share one run
+inflight: "dict[str, Job]" = {}
+
+def _pending_jobs():
+    return sum(1 for j in jobs.values() if not j.finished)
+
+def _prune_jobs():
+    finished = [jid for jid, j in jobs.items() if j.finished]
+    for jid in finished[:max(0, len(finished) - JOB_RETENTION)]:
+        del jobs[jid]
+
+async def result_cache_key(file_id: str, user_tags=None) -> str:
+    """(input hash, engine version, model, pattern/tag config hash) -> one key."""
+    # Content-addressed uploads are named by their SHA-256, so a hex digest naming an existing
+    # upload is its hash; anything else (older uuid-named uploads) is hashed from the file
+    input_path = os.path.join(UPLOAD_DIR, f"{file_id}.pdf")
+    if re.fullmatch(r"[0-9a-f]{64}", file_id) and await run_in_threadpool(os.path.isfile, input_path):
+        input_sha = file_id
+    else:
+        input_sha = await run_in_threadpool(redactor._sha256, pathlib.Path(input_path))
+    model_name = worker_pool.model_name or await run_in_threadpool(redactor.resolve_model_name)
+    return redactor.manifest_key(input_sha, redactor.config_fingerprint(model_name, user_tags))
+
+def _result_paths(cache_key: str):
+    return (os.path.join(UPLOAD_DIR, f"redacted_{cache_key}.pdf"),
+            os.path.join(UPLOAD_DIR, f"redacted_{cache_key}.json"))
+
+def _read_cached_audit(pdf_path: str, audit_path: str):
+    """Audit of a finished cached result, or None if there is none or it is unreadable (e.g. torn by a crash)."""
+    if not (os.path.exists(pdf_path) and os.path.exists(audit_path)):
+        return None
+    try:
+        with open(audit_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+async def create_job(file_id: str) -> Job:
+    input_path = os.path.join(UPLOAD_DIR, f"{file_id}.pdf")
+    if not await asyncio.to_thread(os.path.exists, input_path):
+        raise HTTPException(status_code=404, detail="File not found.")
+    cache_key = await result_cache_key(file_id)
+    if cache_key in inflight:
+        return inflight[cache_key]
+    pdf_path, audit_path = _result_paths(cache_key)
+    cached_audit = await asyncio.to_thread(_read_cached_audit, pdf_path, audit_path)
+    # Another request may have started the same job while the audit was being read
+    if cache_key in inflight:
+        return inflight[cache_key]
+    if cached_audit is None and _pending_jobs() >= REDACT_MAX_PENDING:
+        raise HTTPException(status_code=503, detail="Redaction queue is full, retry shortly.")
+    _prune_jobs()
+    job = Job(file_id, cache_key)
+    jobs[job.id] = job
+    job.publish("status", status=job.status)
+    if cached_audit is not None:
+        finish_job(job, cached_audit, cached=True)
+    else:
+        inflight[cache_key] = job
+        job.task = asyncio.create_task(run_job(job, input_path))
+    return job
+
+def finish_job(job: Job, audit: dict, cached: bool = False):
+    job.status, job.percent = "done", 100
+    job.result = {
+        "redacted_file_url": f"/download/{os.path.basename(_result_paths(job.cache_key)[0])}",
+        "audit": audit,
+        "cached": cached,
+    }
+    job.publish("done", **job.result)
+
+async def run_job(job: Job, input_path: str):
+    pdf_path, audit_path = _result_paths(job.cache_key)
+    try:
+        audit = await worker_pool.submit(
+            "redact",
+            {"input": input_path, "output": pdf_path},
+            on_progress=job.on_progress,
+        )
+        # Audit is written last, atomically: its presence marks the cached artifact complete
+        await run_in_threadpool(redactor._write_atomic, pathlib.Path(audit_path), json.dumps(audit).encode("utf-8"))
+        finish_job(job, audit)
+    except Exception as e:
+        job.status, job.error = "error", f"Redaction process failed: {e}"
+        job.publish("error", error=job.error)
+    finally:
+        inflight.pop(job.cache_key, None)
+
+def get_job(job_id: str) -> Job:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
+async def job_event_stream(job: Job):
+    sent = 0
+    while True:
+        while sent < len(job.events):
+            event_type, data = job.events[sent]
+            sent += 1
+            yield f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+        if job.finished:
+            return
+        wake = job._wake
+        try:
+            await asyncio.wait_for(wake.wait(), timeout=SSE_KEEPALIVE_SECONDS)
+        except asyncio.TimeoutError:
+            # Comment line keeps proxies/load balancers from closing an idle stream
+            yield ": keepalive\n\n"
+
+class JobRequest(BaseModel):
+    file_id: str
+
+class DetectRequest(BaseModel):
+    texts: list[str]
+
 # Serve frontend static files if directory exists
 STATIC_DIR = pathlib.Path(__file__).parent.resolve() / "static"
 if STATIC_DIR.is_dir():
@@ -33,6 +232,19 @@ else:
 # Serve the web interface HTML file at root, renamed to CLARA.html
 WEB_INTERFACE_PATH = pathlib.Path(__file__).parent.resolve() / "CLARA.html"
 
+@app.on_event("startup")
+async def start_worker_pool():
+    # Workers load models in the background so the first job doesn't pay for it
+    worker_pool.start()
+    if detect_pool is not worker_pool:
+        detect_pool.start()
+
+@app.on_event("shutdown")
+async def stop_worker_pool():
+    await run_in_threadpool(worker_pool.stop)
+    if detect_pool is not worker_pool:
+        await run_in_threadpool(detect_pool.stop)
+
 @app.get("/", response_class=HTMLResponse)
 async def serve_web_interface():
     if not WEB_INTERFACE_PATH.exists():
@@ -43,32 +255,72 @@ async def serve_web_interface():
 async def upload_pdf(file: UploadFile = File(...)):
     if not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
-    file_id = str(uuid.uuid4())
+    # Chunked copy to a temp name, hashing as we go: reads are async, disk writes
+    # go to the threadpool. The upload is then stored under its SHA-256, so the
+    # same PDF uploaded again is kept (and redacted) only once.
+    tmp_path = os.path.join(UPLOAD_DIR, f"upload_{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    buffer = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+    finally:
+        await run_in_threadpool(buffer.close)
+    file_id = digest.hexdigest()
     file_path = os.path.join(UPLOAD_DIR, f"{file_id}.pdf")
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    return {"file_id": file_id, "filename": file.filename}
+    duplicate = os.path.exists(file_path)
+    if duplicate:
+        await run_in_threadpool(os.remove, tmp_path)
+    else:
+        await run_in_threadpool(os.replace, tmp_path, file_path)
+    return {"file_id": file_id, "filename": file.filename, "duplicate": duplicate}
 
-@app.post("/process_pdf/{file_id}")
-async def process_pdf(file_id: str):
-    import subprocess
-    input_path = os.path.join(UPLOAD_DIR, f"{file_id}.pdf")
-    if not os.path.exists(input_path):
-        raise HTTPException(status_code=404, detail="File not found.")
-    output_path = os.path.join(UPLOAD_DIR, f"{file_id}_redacted.pdf")
+@app.post("/jobs", status_code=202)
+async def submit_job(req: JobRequest):
+    job = await create_job(req.file_id)
+    return {
+        "job_id": job.id,
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events",
+    }
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    return get_job(job_id).snapshot()
 
-    # Call the existing PDF_PII_redactor_SL_v5.py script as a subprocess
-    # Assuming the script accepts input and output file paths as arguments
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    job = get_job(job_id)
+    return StreamingResponse(
+        job_event_stream(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/detect")
+async def detect(req: DetectRequest):
+    """Labelled PII character spans for free text; no PDF needed."""
     try:
-        subprocess.run([
-            "python", "PDF_PII_redactor_SL_v5.py",
-            "--input", input_path,
-            "--output", output_path
-        ], check=True)
-    except subprocess.CalledProcessError as e:
-        raise HTTPException(status_code=500, detail=f"Redaction process failed: {e}")
-
-    return {"redacted_file_url": f"/download/{file_id}_redacted.pdf"}
+        results = await detect_batcher.detect(req.texts)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Detection failed: {e}")
+    return {"results": [{"text": text, "spans": spans} for text, spans in zip(req.texts, results)]}
+
+@app.get("/detect/stats")
+async def detect_stats():
+    return detect_batcher.stats()
+
+@app.post("/process_pdf/{file_id}")
+async def process_pdf(file_id: str):
+    # Synchronous wrapper kept for existing clients; new clients should use /jobs
+    job = await create_job(file_id)
+    if job.task:
+        # shield: a disconnecting client must not cancel a run other requests may share
+        await asyncio.shield(job.task)
+    if job.status == "error":
+        raise HTTPException(status_code=500, detail=job.error)
+    return {"redacted_file_url": job.result["redacted_file_url"]}
 
 @app.get("/download/{filename}")
 async def download_file(filename: str):
@@ -0,0 +1,67 @@
+"""
+micro_batcher.py
+----------------
+Coalesces concurrent /detect requests into shared nlp.pipe batches.
+
+Texts are queued with a future each. A batch is sent to the worker pool as soon
+as max_batch texts are waiting, or max_wait_ms after the first text of a batch
+arrived, whichever comes first. Under light load a request waits at most
+max_wait_ms; under heavy load batches fill up and throughput scales with them.
+Give it a pool of its own: on a pool shared with PDF redaction a batch waits for
+the whole job ahead of it.
+"""
+
+import asyncio
+
+
+class MicroBatcher:
+    def __init__(self, pool, max_batch=64, max_wait_ms=10.0):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._waiting = []   # [(text, future)]
+        self._timer = None
+        self.batches = 0
+        self.texts = 0
+
+    async def detect(self, texts):
+        """Return one span list per text, computed in whatever batch they land in."""
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        self._waiting.extend(zip(texts, futures))
+        if len(self._waiting) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await asyncio.gather(*futures)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiting:
+            batch, self._waiting = self._waiting[:self.max_batch], self._waiting[self.max_batch:]
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch):
+        self.batches += 1
+        self.texts += len(batch)
+        try:
+            results = await self.pool.submit("detect", {"texts": [text for text, _ in batch]})
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), spans in zip(batch, results):
+            if not fut.done():
+                fut.set_result(spans)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
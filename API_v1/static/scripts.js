@@ -70,28 +70,74 @@ document.addEventListener('DOMContentLoaded', () => {
         contentSection.innerHTML = `
             <h2>Auto Redact PDF</h2>
             <button id="processBtn">Start Redaction</button>
+            <progress id="processProgress" max="100" value="0" hidden></progress>
             <div id="processStatus"></div>
             <div id="downloadLink"></div>
         `;
 
         const processBtn = document.getElementById('processBtn');
         const processStatus = document.getElementById('processStatus');
+        const processProgress = document.getElementById('processProgress');
         const downloadLink = document.getElementById('downloadLink');
 
+        const stageLabels = {
+            extract: 'Extracting form fields',
+            correct: 'Correcting text',
+            ner: 'Detecting PII',
+            write: 'Writing redactions',
+            save: 'Saving PDF'
+        };
+
         processBtn.addEventListener('click', () => {
-            processStatus.textContent = 'Processing...';
+            processStatus.textContent = 'Queued...';
+            processProgress.hidden = false;
+            processProgress.value = 0;
             downloadLink.innerHTML = '';
+            processBtn.disabled = true;
 
-            fetch('/process_pdf/' + window.uploadedFileId, {
-                method: 'POST'
+            fetch('/jobs', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ file_id: window.uploadedFileId })
             })
-            .then(response => response.json())
-            .then(data => {
-                processStatus.textContent = 'Processing complete.';
-                downloadLink.innerHTML = '<a href="' + data.redacted_file_url + '" target="_blank" download>Download Redacted PDF</a>';
+            .then(response => {
+                if (!response.ok) {
+                    return response.json().then(err => { throw new Error(err.detail || response.statusText); });
+                }
+                return response.json();
+            })
+            .then(job => {
+                const events = new EventSource(job.events_url);
+                events.addEventListener('progress', e => {
+                    const data = JSON.parse(e.data);
+                    processProgress.value = data.percent;
+                    processStatus.textContent = (stageLabels[data.stage] || data.stage) +
+                        ' (' + data.done + '/' + data.total + ')';
+                });
+                events.addEventListener('done', e => {
+                    const data = JSON.parse(e.data);
+                    events.close();
+                    processBtn.disabled = false;
+                    processProgress.value = 100;
+                    processStatus.textContent = 'Processing complete.';
+                    downloadLink.innerHTML = '<a href="' + data.redacted_file_url + '" target="_blank" download>Download Redacted PDF</a>';
+                });
+                events.addEventListener('error', e => {
+                    // Server-sent 'error' events carry data; connection errors do not
+                    if (e.data) {
+                        processStatus.textContent = JSON.parse(e.data).error;
+                    } else if (events.readyState !== EventSource.CLOSED) {
+                        return;  // browser will reconnect and replay the stream
+                    } else {
+                        processStatus.textContent = 'Processing failed.';
+                    }
+                    events.close();
+                    processBtn.disabled = false;
+                });
             })
             .catch(err => {
-                processStatus.textContent = 'Processing failed.';
+                processStatus.textContent = 'Processing failed: ' + err.message;
+                processBtn.disabled = false;
                 console.error(err);
             });
         });
@@ -0,0 +1,233 @@
+"""
+worker_pool.py
+--------------
+Long-lived redaction worker processes for the API backend.
+
+Each worker loads spaCy, SymSpell and LanguageTool once (same initialiser as the
+CLI's --workers mode) and then keeps serving jobs, so a request only pays for the
+actual redaction, not for the model load.
+
+Each worker has its own job queue (the pool sends new jobs to the least busy
+one); results come back on a shared queue and are handed to the asyncio loop by
+a listener thread. A worker that dies fails the jobs it held and is respawned.
+One that dies while loading its models (e.g. no spaCy model installed) keeps its
+queued jobs and is respawned with exponential backoff; after MAX_INIT_FAILURES
+failures in a row the pool is marked unhealthy and every pending and new job
+fails with the load error.
+"""
+
+import asyncio
+import itertools
+import multiprocessing as mp
+import os
+import pathlib
+import queue
+import sys
+import threading
+import time
+
+# Redaction core lives in the Streamlit-free module next to the UI code
+REDACTOR_DIR = pathlib.Path(__file__).parent.resolve().parent / "Heitech Redaction" / "For UI"
+sys.path.insert(0, str(REDACTOR_DIR))
+import PDF_PII_redactor_v11_noui as redactor
+
+# Consecutive worker start-up failures before the pool gives up, and the respawn delay after the
+# n-th one (RESPAWN_BACKOFF_SECONDS * 2**(n-1), capped at RESPAWN_BACKOFF_MAX_SECONDS)
+MAX_INIT_FAILURES = 5
+RESPAWN_BACKOFF_SECONDS = 1.0
+RESPAWN_BACKOFF_MAX_SECONDS = 60.0
+
+
+def _run_job(kind, payload, engines, progress):
+    if kind == "redact":
+        data, audit = redactor.redact_full_pdf_bytes(
+            pathlib.Path(payload["input"]), nlp=engines["nlp"], sym=engines["sym"], lt_tool=engines["lt_tool"],
+            user_tags=payload.get("tags"), batch_size=engines["batch_size"], progress=progress
+        )
+        redactor._write_atomic(pathlib.Path(payload["output"]), data)
+        return audit
+    if kind == "detect":
+        return redactor.detect_spans(engines["nlp"], payload["texts"], batch_size=engines["batch_size"])
+    raise ValueError(f"Unknown job kind: {kind}")
+
+
+def _worker_main(job_q, event_q, no_spell, no_grammar, batch_size):
+    try:
+        redactor._init_worker(no_spell, no_grammar, batch_size, None)
+    except Exception as e:
+        event_q.put(("init_error", None, {"pid": os.getpid(), "error": f"{type(e).__name__}: {e}"}))
+        sys.exit(1)
+    engines = redactor._WORKER
+    event_q.put(("ready", None, {"model": engines["model_name"], "pid": os.getpid()}))
+    while True:
+        job = job_q.get()
+        if job is None:
+            break
+        job_id, kind, payload = job
+
+        def progress(stage, info, job_id=job_id):
+            event_q.put(("progress", job_id, {"stage": stage, **info}))
+
+        try:
+            event_q.put(("done", job_id, _run_job(kind, payload, engines, progress)))
+        except Exception as e:
+            event_q.put(("error", job_id, f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    """One worker process with its own job queue, so the pool knows which jobs it holds.
+
+    job_q/jobs are handed over when a worker that never got ready is replaced,
+    since it died before taking any job off the queue.
+    """
+
+    def __init__(self, ctx, event_q, args, job_q=None, jobs=None):
+        self.job_q = job_q or ctx.Queue()
+        self.jobs = jobs if jobs is not None else set()
+        self.ready = False
+        self.respawn_at = None   # set while dead and waiting out the backoff
+        self.proc = ctx.Process(target=_worker_main, args=(self.job_q, event_q, *args), daemon=True)
+        self.proc.start()
+
+
+class RedactionWorkerPool:
+    """Pool of warm worker processes fed through per-worker job queues."""
+
+    def __init__(self, workers=1, no_spell=False, no_grammar=False, batch_size=redactor.DEFAULT_BATCH_SIZE):
+        self.workers = workers
+        self._args = (no_spell, no_grammar, batch_size)
+        # spawn: torch and fork don't mix, and workers should not inherit the server's state
+        self._ctx = mp.get_context("spawn")
+        self._event_q = self._ctx.Queue()
+        self._slots = []
+        self._pending = {}   # job_id -> asyncio.Future
+        self._on_progress = {}   # job_id -> callback(stage, info) run on the event loop
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._listener = None
+        self._stopping = False
+        self.model_name = None
+        self._init_failures = 0
+        self._last_init_error = None
+        self.init_error = None   # set once the pool has given up on starting workers
+
+    def start(self, loop=None):
+        self._loop = loop or asyncio.get_running_loop()
+        self._slots = [_Worker(self._ctx, self._event_q, self._args) for _ in range(self.workers)]
+        self._listener = threading.Thread(target=self._listen, name="redact-pool-listener", daemon=True)
+        self._listener.start()
+
+    def stop(self):
+        self._stopping = True
+        for w in self._slots:
+            w.job_q.put(None)
+        for w in self._slots:
+            w.proc.join(timeout=10)
+            if w.proc.is_alive():
+                w.proc.terminate()
+        self._event_q.put(None)
+        if self._listener:
+            self._listener.join(timeout=5)
+        for job_id in list(self._pending):
+            self._loop.call_soon_threadsafe(self._resolve, "error", job_id, "Worker pool shut down")
+
+    async def submit(self, kind, payload, on_progress=None):
+        """Queue a job on the least busy worker and wait without blocking the event loop.
+
+        on_progress(stage, info) is called on the event loop for each stage update.
+        """
+        if self.init_error:
+            raise RuntimeError(f"Redaction workers could not start: {self.init_error}")
+        job_id = next(self._ids)
+        fut = self._loop.create_future()
+        self._pending[job_id] = fut
+        if on_progress:
+            self._on_progress[job_id] = on_progress
+        with self._lock:
+            # Prefer live workers; a slot waiting to respawn keeps the job queued for its successor
+            worker = min(self._slots, key=lambda w: (w.respawn_at is not None, len(w.jobs)))
+            worker.jobs.add(job_id)
+            worker.job_q.put((job_id, kind, payload))
+        return await fut
+
+    def _listen(self):
+        while True:
+            self._reap()
+            try:
+                msg = self._event_q.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if msg is None:
+                break
+            kind, job_id, payload = msg
+            if kind == "ready":
+                self.model_name = payload["model"]
+                with self._lock:
+                    self._init_failures = 0
+                    for w in self._slots:
+                        if w.proc.pid == payload["pid"]:
+                            w.ready = True
+                continue
+            if kind == "init_error":
+                self._last_init_error = payload["error"]
+                continue
+            if kind == "progress":
+                self._loop.call_soon_threadsafe(self._report, job_id, payload)
+                continue
+            with self._lock:
+                for w in self._slots:
+                    w.jobs.discard(job_id)
+            self._loop.call_soon_threadsafe(self._resolve, kind, job_id, payload)
+
+    def _reap(self):
+        # A worker that died (OOM, segfault in a native lib) fails the jobs it held and is replaced;
+        # one that died while starting is replaced with backoff, and repeated start failures are fatal
+        if self._stopping or self.init_error:
+            return
+        with self._lock:
+            now = time.monotonic()
+            for i, w in enumerate(self._slots):
+                if w.proc.is_alive():
+                    continue
+                if w.respawn_at is not None:
+                    if now >= w.respawn_at:
+                        self._slots[i] = _Worker(self._ctx, self._event_q, self._args, w.job_q, w.jobs)
+                    continue
+                if w.ready:
+                    for job_id in w.jobs:
+                        self._loop.call_soon_threadsafe(
+                            self._resolve, "error", job_id, f"Worker exited with code {w.proc.exitcode}"
+                        )
+                    self._slots[i] = _Worker(self._ctx, self._event_q, self._args)
+                    continue
+                self._init_failures += 1
+                if self._init_failures >= MAX_INIT_FAILURES:
+                    self._give_up(self._last_init_error or f"Worker exited with code {w.proc.exitcode} while starting")
+                    return
+                w.respawn_at = now + min(RESPAWN_BACKOFF_MAX_SECONDS,
+                                         RESPAWN_BACKOFF_SECONDS * 2 ** (self._init_failures - 1))
+
+    def _give_up(self, error):
+        # Called with the lock held: no more respawns, and every waiting job learns why
+        self.init_error = error
+        print(f"Redaction workers failed to start {self._init_failures} times, giving up: {error}", file=sys.stderr)
+        for w in self._slots:
+            w.jobs.clear()
+        for job_id in list(self._pending):
+            self._loop.call_soon_threadsafe(self._resolve, "error", job_id, f"Redaction workers could not start: {error}")
+
+    def _report(self, job_id, payload):
+        callback = self._on_progress.get(job_id)
+        if callback:
+            callback(payload.pop("stage"), payload)
+
+    def _resolve(self, kind, job_id, payload):
+        self._on_progress.pop(job_id, None)
+        fut = self._pending.pop(job_id, None)
+        if fut is None or fut.done():
+            return
+        if kind == "done":
+            fut.set_result(payload)
+        else:
+            fut.set_exception(RuntimeError(payload))
@@ -14,13 +14,47 @@ Reliable detection with straightforward patterns
 import re
 import sys
 import os
+import csv
+import time
+import json
+import hashlib
+import argparse
+import itertools
+import importlib.util
+import bisect
+import heapq
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Optional
 
-try:
-    from presidio_analyzer import AnalyzerEngine
-    PRESIDIO_AVAILABLE = True
-except ImportError:
-    PRESIDIO_AVAILABLE = False
+# Presidio (and the spaCy model behind it) is only imported and loaded when an
+# engine first needs targeted detection, so importing this module stays cheap
+PRESIDIO_AVAILABLE = importlib.util.find_spec('presidio_analyzer') is not None
+
+# Presidio ORG results remembered per text (by content hash), least recently used dropped past this
+ORG_RESULT_CACHE_SIZE = 10000
+
+# spaCy refuses texts longer than nlp.max_length (1,000,000 by default), so longer
+# Presidio inputs are split at whitespace with this much context shared across each split
+PRESIDIO_MAX_CHARS = 1000000
+PRESIDIO_SPLIT_CONTEXT = 200
+
+MANUFACTURING_TRIGGERS = [
+    'manufacturer', 'company', 'made by', 'produced by', 'distributor',
+    'supplier', 'corporation', 'inc', 'ltd', 'llc', 'contacted'
+]
+
+REGULATORY_TRIGGERS = [
+    'registration', 'clearance', 'approval', 'fda', 'model',
+    'serial', 'part', 'regulatory', 'compliance'
+]
+
+# Context rules for targeted detection: name -> (trigger keywords, window in chars).
+# A candidate qualifies if a keyword occurs within the window on either side.
+# Keywords match as case-insensitive substrings ('inc' also hits 'incident').
+CONTEXT_RULES = {
+    'manufacturing': (MANUFACTURING_TRIGGERS, 30),
+    'regulatory': (REGULATORY_TRIGGERS, 20),
+}
 
 # Expanded pharmaceutical and medical terms
 PHARMACEUTICAL_NAMES = [
@@ -87,17 +121,955 @@ PROFANITY_WORDS = {
     'asshole', 'dickhead', 'motherfucker', 'goddamn', 'bloody', 'cocksucker'
 }
 
+# Detector pattern families, compiled once per engine into a single scanner.
+# family -> (re flags, [(pattern, confidence, type, method), ...])
+# A pattern that is a list of terms is matched as a lexicon (see LexiconMatcher).
+# Order matters: findings are emitted family by family and pattern by pattern, as
+# the original one-method-per-detector loops did, so remove_overlaps sees the same
+# order and breaks confidence ties the same way.
+PATTERN_FAMILIES = {
+    'names': (0, [
+        # Dr. + Name patterns
+        (r'\bDr\.?\s+([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,})', 0.95, 'NAME', 'name_pattern'),
+        (r'\bDoctor\s+([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,})', 0.95, 'NAME', 'name_pattern'),
+
+        # Reporter names (with context)
+        (r'\b(?:Reporter|Reported\s+by|Contact)[-:\s]+([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,})', 0.9, 'NAME', 'name_pattern'),
+
+        # Simple two-word names (first + last)
+        (r'\b([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,})\b', 0.8, 'NAME', 'name_pattern'),
+
+        # Three-word names (first + middle + last)
+        (r'\b([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,}\s+[A-Z][a-z]{2,})\b', 0.85, 'NAME', 'name_pattern'),
+    ]),
+    'locations': (0, [
+        # Facility names
+        (r'\b([A-Z][a-z]{2,}\s+(?:Hospital|Medical\s+Center|Clinic|Health\s+Center|Healthcare|Medical\s+Group))\b', 0.9, 'FACILITY', 'location_pattern'),
+        (r'\b([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,}\s+(?:Hospital|Medical\s+Center|Clinic))\b', 0.9, 'FACILITY', 'location_pattern'),
+
+        # City, State patterns
+        (r'\b([A-Z][a-z]{2,},\s*[A-Z][a-z]{2,})\b', 0.85, 'LOCATION', 'location_pattern'),
+        (r'\b([A-Z][a-z]{2,},\s*[A-Z]{2})\b', 0.9, 'LOCATION', 'location_pattern'),
+
+        # Full addresses
+        (r'\b(\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd))', 0.9, 'ADDRESS', 'location_pattern'),
+
+        # ZIP codes
+        (r'\b(\d{5}(?:-\d{4})?)\b', 0.85, 'ZIP', 'location_pattern'),
+
+        # State + ZIP combinations
+        (r'\b([A-Z]{2}\s+\d{5}(?:-\d{4})?)\b', 0.9, 'ADDRESS', 'location_pattern'),
+    ]),
+    'contact_info': (0, [
+        # Phone numbers
+        (r'\b(\(\d{3}\)\s*\d{3}[-.\s]*\d{4})\b', 0.95, 'PHONE', 'contact_pattern'),
+        (r'\b(\d{3}[-.\s]*\d{3}[-.\s]*\d{4})\b', 0.9, 'PHONE', 'contact_pattern'),
+
+        # Email addresses
+        (r'\b([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})\b', 0.98, 'EMAIL', 'contact_pattern'),
+
+        # Social Security Numbers
+        (r'\b(\d{3}-\d{2}-\d{4})\b', 0.95, 'SSN', 'contact_pattern'),
+    ]),
+    'dates': (re.IGNORECASE, [
+        # MM/DD/YYYY, MM-DD-YYYY
+        (r'\b(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})\b', 0.85, 'DATE', 'date_pattern'),
+
+        # ISO dates (YYYY-MM-DD)
+        (r'\b(\d{4}-\d{1,2}-\d{1,2})\b', 0.9, 'DATE', 'date_pattern'),
+
+        # Month DD, YYYY
+        (r'\b((?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4})\b', 0.9, 'DATE', 'date_pattern'),
+
+        # Abbreviated months
+        (r'\b((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[-.\s]+\d{1,2}[-.\s]+\d{2,4})\b', 0.85, 'DATE', 'date_pattern'),
+    ]),
+    'medical_ids': (re.IGNORECASE, [
+        # Medical Record Numbers
+        (r'\b(MRN[-:\s]*[A-Z0-9-]{5,})\b', 0.95, 'MEDICAL_ID', 'medical_id_pattern'),
+        (r'\b(Medical\s+Record\s+Number[-:\s]*[A-Z0-9-]{5,})\b', 0.95, 'MEDICAL_ID', 'medical_id_pattern'),
+
+        # Patient IDs
+        (r'\b(Patient\s+ID[-:\s]*[A-Z0-9-]{5,})\b', 0.9, 'MEDICAL_ID', 'medical_id_pattern'),
+
+        # Generic ID patterns (more conservative)
+        (r'\b([A-Z]{2,3}-\d{6,})\b', 0.8, 'ID', 'medical_id_pattern'),
+        (r'\b(\d{8,12})\b', 0.7, 'ID', 'medical_id_pattern'),  # Long number sequences
+    ]),
+    'pharmaceuticals': (re.IGNORECASE, [
+        # Known pharmaceuticals (exact match)
+        (PHARMACEUTICAL_NAMES, 0.9, 'PHARMACEUTICAL', 'known_pharmaceutical'),
+
+        # Drug dosage patterns
+        (r'\b([A-Za-z]+\s+\d+\s?(?:mg|ml|mcg|g|units?|cc))\b', 0.8, 'PHARMACEUTICAL', 'dosage_pattern'),
+        (r'\b(\d+\s?(?:mg|ml|mcg|g|units?|cc)\s+of\s+[A-Za-z]+)\b', 0.8, 'PHARMACEUTICAL', 'dosage_pattern'),
+    ]),
+    'manufacturing_info': (re.IGNORECASE, [
+        # Serial/Model/Lot numbers with labels
+        (r'\b(?:Serial|SN|S/N|Model|Part|P/N|Lot|Batch)[-:\s]*([A-Z0-9-]{4,})\b', 0.9, 'MANUFACTURING_NUMBER', 'manufacturing_pattern'),
+
+        # Transmitter and Analyzer numbers (FDA specific)
+        (r'\b(?:Transmitter|Analyzer)[-:\s]*(?:Number|#|ID)[-:\s]*([A-Z0-9-]{4,})\b', 0.95, 'TRANSMITTER_ANALYZER', 'manufacturing_pattern'),
+        (r'\b(TM[-]?\d{6,})\b', 0.9, 'TRANSMITTER_ANALYZER', 'manufacturing_pattern'),
+        (r'\b(AN[-]?\d{6,})\b', 0.9, 'TRANSMITTER_ANALYZER', 'manufacturing_pattern'),
+
+        # Regulatory/Registration numbers
+        (r'\b([A-Z]{1,3}\d{5,})\b', 0.9, 'REGULATORY_NUMBER', 'manufacturing_pattern'),  # K011111, FDA12345
+        (r'\bFDA[-\s]*(\d{6,})\b', 0.95, 'REGULATORY_NUMBER', 'manufacturing_pattern'),
+        (r'\b(K\d{6})\b', 0.95, 'REGULATORY_NUMBER', 'manufacturing_pattern'),  # FDA clearance numbers
+
+        # Manufacturing specifications (technical measurements)
+        (r'\b(\d+\.?\d*\s*mm\s+.*?\s+\d+oz\s+package)\b', 0.85, 'MANUFACTURING_SPEC', 'manufacturing_pattern'),
+        (r'\b(\d+\.?\d*\s*mm\s+type\s+thread)\b', 0.85, 'MANUFACTURING_SPEC', 'manufacturing_pattern'),
+        (r'\b(\d+oz\s+package)\b', 0.8, 'MANUFACTURING_SPEC', 'manufacturing_pattern'),
+        (r'\b(ISO\s+\d+)\b', 0.8, 'MANUFACTURING_SPEC', 'manufacturing_pattern'),  # ISO standards
+
+        # Standalone alphanumeric codes
+        (r'\b([A-Z]{2,}\d{4,})\b', 0.7, 'MANUFACTURING_NUMBER', 'manufacturing_pattern'),
+        (r'\b(\d{4,}[A-Z]{2,})\b', 0.7, 'MANUFACTURING_NUMBER', 'manufacturing_pattern'),
+        (r'\b([A-Z]\d+[A-Z]+\d*)\b', 0.75, 'MANUFACTURING_NUMBER', 'manufacturing_pattern'),  # A123B, X1Y2Z3
+    ]),
+    'manufacturers': (re.IGNORECASE, [
+        # Known device manufacturers (not part of the default detection order)
+        (MANUFACTURERS, 0.9, 'ORGANIZATION', 'known_manufacturer'),
+    ]),
+    'profanity': (re.IGNORECASE, [
+        # Profanity for redaction
+        (sorted(PROFANITY_WORDS), 0.99, 'PROFANITY', 'profanity_list'),
+    ]),
+    'financial_info': (re.IGNORECASE, [
+        # Currency amounts
+        (r'\$\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)', 0.85, 'FINANCIAL', 'financial_pattern'),
+        (r'\b(\d{1,3}(?:,\d{3})*(?:\.\d{2})?\s*dollars?)\b', 0.85, 'FINANCIAL', 'financial_pattern'),
+
+        # Financial terms with amounts
+        (r'\b(?:cost|price|revenue|profit|loss|expense|budget|salary|wage)[-:\s]*\$?\s*(\d+(?:,\d{3})*(?:\.\d{2})?)', 0.9, 'FINANCIAL', 'financial_pattern'),
+
+        # Contract values
+        (r'\b(?:contract|agreement)\s+(?:value|amount)[-:\s]*\$?\s*(\d+(?:,\d{3})*)', 0.9, 'FINANCIAL', 'financial_pattern'),
+
+        # Commercial terms
+        (r'\b(proprietary\s+formula)\b', 0.8, 'COMMERCIAL', 'financial_pattern'),
+        (r'\b(trade\s+secret)\b', 0.9, 'COMMERCIAL', 'financial_pattern'),
+        (r'\b(confidential\s+manufacturing)\b', 0.85, 'COMMERCIAL', 'financial_pattern'),
+    ]),
+}
+
+# Detector order used by run_detection
+DETECTION_ORDER = ['names', 'locations', 'contact_info', 'dates', 'medical_ids',
+                   'pharmaceuticals', 'manufacturing_info', 'profanity', 'financial_info']
+
+
+def _valid_date(date_str: str) -> bool:
+    """Basic validation for MM/DD/YYYY format"""
+    if '/' in date_str or '-' in date_str:
+        parts = re.split(r'[-/]', date_str)
+        if len(parts) == 3:
+            try:
+                if len(parts[0]) <= 2:  # MM/DD/YYYY format
+                    month, day, year = int(parts[0]), int(parts[1]), int(parts[2])
+                    if month > 12 or day > 31 or year < 1900 or year > 2030:
+                        return False
+            except ValueError:
+                return False
+    return True
+
+
+# Per-family checks on the detected text beyond the false-positive list
+FAMILY_VALIDATORS = {'dates': _valid_date}
+
+# Families whose matches are rejected if any single word is a false positive
+WORDWISE_FALSE_POSITIVE_FAMILIES = {'names'}
+
+
+# Lexicon text is cut into word runs, single whitespace runs and single symbols;
+# terms only match on whole tokens, which gives the same result as \bterm\b
+_LEXICON_TOKEN = re.compile(r'\w+|\s+|[^\w\s]')
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def split_for_nlp(text: str, limit: int, context: int = PRESIDIO_SPLIT_CONTEXT):
+    """(offset, piece) pairs of at most `limit` characters covering text.
+
+    Pieces end at whitespace where possible and start about `context`
+    characters before the previous end, so an entity next to a split is seen
+    whole, with some context, in at least one piece.
+    """
+    start = 0
+    while len(text) - start > limit:
+        end = start + limit
+        space = _last_whitespace(text, start + limit // 2, end)
+        split = space if space > 0 else end
+        yield start, text[start:split]
+        back = _last_whitespace(text, start + 1, split - context)
+        start = back + 1 if back > 0 else split
+    yield start, text[start:]
+
+
+def _last_whitespace(text: str, lo: int, hi: int) -> int:
+    return max(text.rfind(ch, lo, hi) for ch in ' \n\t\r')
+
+
+def load_lexicon(path: str) -> List[str]:
+    """Read a lexicon file: one term per line, '#' comments and blank lines ignored.
+
+    For .csv files the first column is used (a header row named term/name is skipped).
+    """
+    terms = []
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.lower().endswith('.csv'):
+            rows = (row[0] for row in csv.reader(f) if row)
+        else:
+            rows = f
+        for line in rows:
+            term = line.strip()
+            if not term or term.startswith('#'):
+                continue
+            if not terms and term.lower() in ('term', 'name'):
+                continue
+            terms.append(term)
+    return terms
+
+
+class LexiconMatcher:
+    """Aho-Corasick automaton over word tokens for a list of terms.
+
+    Built once, it finds every occurrence of every term in a single pass over the
+    text, whatever the size of the lexicon, instead of one regex per term. Matching
+    is case-insensitive with \\b...\\b semantics. Like re.finditer, the matches of
+    one term never overlap each other (different terms may overlap).
+    """
+
+    def __init__(self, terms):
+        self.terms = []          # lowercased, de-duplicated, in first-seen order
+        self._index = {}
+        # Trie nodes: goto[node] = {token: child}, out[node] = [(term_id, n_tokens)]
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        # Terms starting/ending with a symbol need an explicit \b check
+        self._edge_check = []
+        for term in terms:
+            self.add(term)
+        self._build()
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, term: str):
+        term = term.lower()
+        tokens = _LEXICON_TOKEN.findall(term)
+        if not tokens or term in self._index:
+            return
+        term_id = len(self.terms)
+        self._index[term] = term_id
+        self.terms.append(term)
+        self._edge_check.append(not _is_word_char(term[0]) or not _is_word_char(term[-1]))
+        node = 0
+        for tok in tokens:
+            nxt = self._goto[node].get(tok)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][tok] = nxt
+            node = nxt
+        self._out[node].append((term_id, len(tokens)))
+
+    def _build(self):
+        # Breadth-first failure links; each node also inherits its fail node's outputs
+        queue = list(self._goto[0].values())
+        for node in queue:
+            self._fail[node] = 0
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for tok, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and tok not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(tok, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def finditer(self, text: str):
+        """Yield (term_id, start, end) for each match, ordered by end position."""
+        goto, fail, out, edge_check = self._goto, self._fail, self._out, self._edge_check
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # a few characters change length when lowercased; keep offsets exact
+            lowered = None
+        # Tokens cover the text end to end, so offsets are running sums of lengths
+        tokens = _LEXICON_TOKEN.findall(text if lowered is None else lowered)
+        starts = []
+        next_pos = {}
+        node = 0
+        pos = 0
+        for i, tok in enumerate(tokens):
+            starts.append(pos)
+            pos += len(tok)
+            key = tok.lower() if lowered is None else tok
+            while node and key not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(key, 0)
+            if not out[node]:
+                continue
+            for term_id, n_tokens in out[node]:
+                start = starts[i - n_tokens + 1]
+                if start < next_pos.get(term_id, 0):
+                    continue
+                if edge_check[term_id] and not self._at_boundaries(text, start, pos):
+                    continue
+                next_pos[term_id] = pos
+                yield term_id, start, pos
+
+    @staticmethod
+    def _at_boundaries(text: str, start: int, end: int) -> bool:
+        def boundary(pos):
+            before = pos > 0 and _is_word_char(text[pos - 1])
+            after = pos < len(text) and _is_word_char(text[pos])
+            return before != after
+        return boundary(start) and boundary(end)
+
+
+class PatternProfiler:
+    """Per-pattern cost and yield over a corpus run (SimplifiedRedactionEngine(profile=True)).
+
+    For every detector family and pattern it accumulates wall time, raw match
+    count, findings left after the false-positive checks, findings surviving
+    remove_overlaps and how many of those were classified B4 / B6. In stream
+    mode each window counts as a text, and matches in the re-scanned context
+    around seams are counted again (kept/B4/B6 are not).
+    """
+
+    COLUMNS = ('family', 'pattern', 'seconds', 'matches', 'findings', 'kept', 'b4', 'b6')
+
+    def __init__(self):
+        self.stats = {}   # pattern id -> row dict
+        self.texts = 0
+
+    def _row(self, pattern_id: str, family: str, label: str) -> Dict:
+        row = self.stats.get(pattern_id)
+        if row is None:
+            row = self.stats[pattern_id] = {'id': pattern_id, 'family': family, 'pattern': label,
+                                            'seconds': 0.0, 'matches': 0, 'findings': 0,
+                                            'kept': 0, 'b4': 0, 'b6': 0}
+        return row
+
+    def record_scan(self, pattern_id: str, family: str, label: str, seconds: float, matches: int):
+        row = self._row(pattern_id, family, label)
+        row['seconds'] += seconds
+        row['matches'] += matches
+
+    def record_findings(self, findings: List[Dict]):
+        for finding in findings:
+            self.stats[finding['pattern_id']]['findings'] += 1
+
+    def record_kept(self, classified: List[Dict]):
+        """Count surviving findings and drop their pattern_id tag"""
+        self.texts += 1
+        for finding in classified:
+            row = self.stats[finding.pop('pattern_id')]
+            row['kept'] += 1
+            if finding['classification'] == 'B4':
+                row['b4'] += 1
+            elif finding['classification'] == 'B6':
+                row['b6'] += 1
+
+    def rows(self, sort_by: str = 'seconds', descending: bool = True) -> List[Dict]:
+        if sort_by not in self.COLUMNS:
+            raise ValueError(f"sort_by must be one of {self.COLUMNS}")
+        return sorted(self.stats.values(), key=lambda row: row[sort_by], reverse=descending)
+
+    def report(self, sort_by: str = 'seconds', descending: bool = True, top: Optional[int] = None) -> str:
+        """Plain-text table, most expensive (or whatever sort_by says) first"""
+        rows = self.rows(sort_by, descending)[:top]
+        total = sum(row['seconds'] for row in self.stats.values()) or 1.0
+        lines = [f"Pattern profile over {self.texts} texts (sorted by {sort_by})",
+                 f"{'id':<22} {'seconds':>9} {'share':>6} {'matches':>8} {'findings':>8} {'kept':>7} "
+                 f"{'B4':>6} {'B6':>6}  pattern"]
+        for row in rows:
+            lines.append(f"{row['id']:<22} {row['seconds']:>9.4f} {row['seconds'] / total:>6.1%} "
+                         f"{row['matches']:>8} {row['findings']:>8} {row['kept']:>7} "
+                         f"{row['b4']:>6} {row['b6']:>6}  {row['pattern'][:60]}")
+        return "\n".join(lines)
+
+    def to_csv(self, path: str, sort_by: str = 'seconds'):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=('id',) + self.COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.rows(sort_by))
+
+
+# Regex engines for the detectors. 're' (stdlib, the default) is fastest on
+# normal text but backtracks, and some patterns go quadratic or worse on hostile
+# input such as long digit runs, "1 mm 1 mm ..." or "a.a.a.a...". 're2'
+# (google-re2) matches in linear time; 'regex' (mrab-regex) still backtracks but
+# gives up on a pattern once it exceeds a time budget. 'auto' picks re2, then
+# regex, then re, whichever is installed.
+REGEX_BACKENDS = ('re', 're2', 'regex')
+DEFAULT_MATCH_TIMEOUT = 0.05   # seconds per pattern per text, 'regex' backend
+
+
+def resolve_regex_backend(backend: str = 'auto') -> str:
+    if backend == 'auto':
+        for name in ('re2', 'regex'):
+            if importlib.util.find_spec(name) is not None:
+                return name
+        return 're'
+    if backend not in REGEX_BACKENDS:
+        raise ValueError(f"Unknown regex backend {backend!r}, expected 'auto' or one of {REGEX_BACKENDS}")
+    if backend != 're' and importlib.util.find_spec(backend) is None:
+        raise ImportError(f"Regex backend {backend!r} is not installed")
+    return backend
+
+
+class GuardedPattern:
+    """A detector regex compiled for one of REGEX_BACKENDS."""
+
+    def __init__(self, pattern: str, flags: int, backend: str, timeout: float = DEFAULT_MATCH_TIMEOUT):
+        self.pattern = pattern
+        self.backend = backend
+        self.timeout = timeout
+        self.timeouts = 0
+        self.group = 1 if re.compile(pattern).groups else 0
+        ignore_case = bool(flags & re.IGNORECASE)
+        if backend == 're2':
+            import re2
+            self._compiled = re2.compile(('(?i)' if ignore_case else '') + pattern)
+        elif backend == 'regex':
+            import regex
+            self._compiled = regex.compile(pattern, regex.IGNORECASE if ignore_case else 0)
+        else:
+            self._compiled = re.compile(pattern, flags)
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """Non-overlapping match spans (of group 1 when the pattern has one).
+
+        On the 'regex' backend a pattern that runs out of time budget stops
+        there and keeps the matches found so far.
+        """
+        g = self.group
+        if self.backend != 'regex':
+            return [m.span(g) for m in self._compiled.finditer(text)]
+        spans = []
+        try:
+            for m in self._compiled.finditer(text, timeout=self.timeout):
+                spans.append(m.span(g))
+        except TimeoutError:
+            self.timeouts += 1
+        return spans
+
+
+# Joins texts for batch scanning; NUL is in no pattern and . stops at the newline
+BATCH_SEPARATOR_CHAR = '\x00'
+BATCH_SEPARATOR = '\n\x00\n'
+
+
+class MultiPatternScanner:
+    """Walk the text once for many pattern families.
+
+    All regex patterns are folded into one regex of zero-width lookaheads, so a
+    single finditer pass finds every position where at least one pattern matches
+    and which pattern matches first there. Only at those positions are the
+    individual precompiled patterns tried. Each pattern also remembers where its
+    last match ended, which gives exactly the non-overlapping matches a separate
+    re.finditer per pattern would have produced.
+
+    Word lists (pharmaceuticals, profanity, manufacturers) are matched by a
+    LexiconMatcher each, with findings grouped by list entry as the old per-word
+    loops produced them. extra_terms maps a family to more terms (e.g. from
+    lexicon files) for that family's word list.
+
+    With a regex_backend other than 're' the shared pass is not used; every
+    pattern runs on its own through a GuardedPattern, so worst-case time is
+    bounded by the backend instead.
+    """
+
+    def __init__(self, families: List[str], is_false_positive, extra_terms: Optional[Dict[str, List[str]]] = None,
+                 regex_backend: str = 're', match_timeout: float = DEFAULT_MATCH_TIMEOUT):
+        self._is_false_positive = is_false_positive
+        self.regex_backend = regex_backend
+        extra_terms = extra_terms or {}
+        # spec: (family, compiled regex or LexiconMatcher, confidence, type, method, is lexicon)
+        self.specs = []
+        for family in families:
+            flags, patterns = PATTERN_FAMILIES[family]
+            for pattern, confidence, detection_type, method in patterns:
+                if isinstance(pattern, str):
+                    self.specs.append((family, re.compile(pattern, flags), confidence,
+                                       detection_type, method, False))
+                else:
+                    matcher = LexiconMatcher(list(pattern) + list(extra_terms.get(family, ())))
+                    self.specs.append((family, matcher, confidence, detection_type, method, True))
+        # spec index -> GuardedPattern, only for non-'re' backends
+        self._guarded = {}
+        if regex_backend != 're':
+            self._guarded = {i: GuardedPattern(spec[1].pattern, spec[1].flags, regex_backend, match_timeout)
+                             for i, spec in enumerate(self.specs) if not spec[5]}
+        self._trigger = None if self._guarded else self._build_trigger()
+
+    def _build_trigger(self):
+        # Patterns starting with \b can only match at a word boundary; trying
+        # them only there lets the engine skip most positions cheaply.
+        # Each pattern goes in verbatim, capture groups and all, followed by an
+        # empty group named after its spec: that group closes last, so lastgroup
+        # names the alternative that matched whatever groups the pattern has.
+        # (Backreferences would point at the wrong groups here; trigger_agrees
+        # catches that for PATTERN_FAMILIES.)
+        bounded, unbounded = [], []
+        for i, spec in enumerate(self.specs):
+            if spec[5]:
+                continue
+            compiled = spec[1]
+            body = compiled.pattern
+            if compiled.flags & re.IGNORECASE:
+                body = f'(?i:{body})'
+            alt = f'(?={body})(?P<_{i}>)'
+            (bounded if compiled.pattern.startswith(r'\b') else unbounded).append((i, alt))
+        # Trigger alternatives must be in spec order (bounded first) for the
+        # "first match at this position" index to be meaningful
+        self._order = [i for i, _ in bounded] + [i for i, _ in unbounded]
+        self._rank = {i: r for r, i in enumerate(self._order)}
+        parts = []
+        if bounded:
+            parts.append(r'\b(?:' + '|'.join(alt for _, alt in bounded) + ')')
+        if unbounded:
+            parts.append('(?:' + '|'.join(alt for _, alt in unbounded) + ')')
+        return re.compile('|'.join(parts)) if parts else None
+
+    def trigger_agrees(self, text: str) -> bool:
+        """True if at every position of text the trigger names the first pattern,
+        in scan order, whose own regex matches there."""
+        if self._trigger is None:
+            return True
+        for pos in range(len(text) + 1):
+            expected = next((i for i in self._order if self.specs[i][1].match(text, pos)), None)
+            trig = self._trigger.match(text, pos)
+            if (int(trig.lastgroup[1:]) if trig else None) != expected:
+                return False
+        return True
+
+    def _keep(self, family: str, detected_text: str) -> bool:
+        # Check false positives
+        if family in WORDWISE_FALSE_POSITIVE_FAMILIES:
+            if any(self._is_false_positive(word) for word in detected_text.split()):
+                return False
+        elif self._is_false_positive(detected_text):
+            return False
+        validator = FAMILY_VALIDATORS.get(family)
+        return validator is None or validator(detected_text)
+
+    def _findings(self, text: str, spans) -> List[Dict]:
+        """Turn per-spec span lists [(start, end), ...] into findings, in spec order."""
+        findings = []
+        for (family, _, confidence, detection_type, method, _), spec_spans in zip(self.specs, spans):
+            for start, end in spec_spans:
+                detected_text = text[start:end]
+
+                if not self._keep(family, detected_text):
+                    continue
+
+                findings.append({
+                    'type': detection_type,
+                    'original': detected_text,
+                    'start': start,
+                    'end': end,
+                    'confidence': confidence,
+                    'method': method
+                })
+        return findings
+
+    def scan(self, text: str) -> List[Dict]:
+        """Return findings in the same order the per-detector loops produced them."""
+        specs = self.specs
+        spans = [[] for _ in specs]
+
+        if self._trigger is not None:
+            next_pos = [0] * len(specs)
+            for trig in self._trigger.finditer(text):
+                pos = trig.start()
+                for i in self._order[self._rank[int(trig.lastgroup[1:])]:]:
+                    if pos < next_pos[i]:
+                        continue
+                    match = specs[i][1].match(text, pos)
+                    if match is None:
+                        continue
+                    next_pos[i] = match.end()
+                    spans[i].append(match.span(1 if match.re.groups else 0))
+        for i, guarded in self._guarded.items():
+            spans[i] = guarded.spans(text)
+
+        for i, spec in enumerate(specs):
+            if spec[5]:
+                # group by list entry, then by position
+                by_term = [[] for _ in range(len(spec[1]))]
+                for term_id, start, end in spec[1].finditer(text):
+                    by_term[term_id].append((start, end))
+                spans[i] = [span for term_spans in by_term for span in term_spans]
+
+        return self._findings(text, spans)
+
+    def timeouts(self) -> int:
+        """How many times a guarded pattern ran out of its time budget"""
+        return sum(guarded.timeouts for guarded in self._guarded.values())
+
+    def scan_batch(self, texts: List[str]) -> List[List[Dict]]:
+        """scan() for many texts through one pass over them joined together.
+
+        The separator contains a newline and a NUL, which no pattern can match
+        across, so per-text results are identical to calling scan() on each.
+        """
+        if self._guarded or any(BATCH_SEPARATOR_CHAR in text for text in texts):
+            # time budgets are per text, so guarded backends scan texts one by one
+            return [self.scan(text) for text in texts]
+        offsets = []
+        pos = 0
+        for text in texts:
+            offsets.append(pos)
+            pos += len(text) + len(BATCH_SEPARATOR)
+        per_text = [[] for _ in texts]
+        for finding in self.scan(BATCH_SEPARATOR.join(texts)):
+            i = bisect.bisect_right(offsets, finding['start']) - 1
+            finding['start'] -= offsets[i]
+            finding['end'] -= offsets[i]
+            per_text[i].append(finding)
+        return per_text
+
+    def scan_profiled(self, text: str, profiler: PatternProfiler) -> List[Dict]:
+        """scan() one pattern at a time, timing each; findings carry a pattern_id.
+
+        Gives the same findings as scan(), just without sharing the single pass.
+        """
+        spans = []
+        ids = []
+        for i, (family, compiled, _, _, _, is_lexicon) in enumerate(self.specs):
+            pattern_id = f"{family}[{i}]"
+            start_time = time.perf_counter()
+            if is_lexicon:
+                by_term = [[] for _ in range(len(compiled))]
+                for term_id, start, end in compiled.finditer(text):
+                    by_term[term_id].append((start, end))
+                spec_spans = [span for term_spans in by_term for span in term_spans]
+                label = f"<lexicon: {len(compiled)} terms>"
+            elif i in self._guarded:
+                spec_spans = self._guarded[i].spans(text)
+                label = compiled.pattern
+            else:
+                spec_spans = [m.span(1 if m.re.groups else 0) for m in compiled.finditer(text)]
+                label = compiled.pattern
+            profiler.record_scan(pattern_id, family, label, time.perf_counter() - start_time, len(spec_spans))
+            spans.append(spec_spans)
+            ids.append(pattern_id)
+        
+        findings = []
+        for spec_index, spec_spans in enumerate(spans):
+            only = [[] for _ in spans]
+            only[spec_index] = spec_spans
+            for finding in self._findings(text, only):
+                finding['pattern_id'] = ids[spec_index]
+                findings.append(finding)
+        return findings
+
+    def scan_per_pattern(self, text: str) -> List[Dict]:
+        """Reference path: one re.finditer per pattern (and per word), as the
+        detectors originally did. Used by the benchmark to check scan()."""
+        spans = []
+        for family, compiled, confidence, detection_type, method, is_lexicon in self.specs:
+            if is_lexicon:
+                runs = [re.finditer(rf'\b{re.escape(word)}\b', text, re.IGNORECASE) for word in compiled.terms]
+            else:
+                runs = [compiled.finditer(text)]
+            spans.append([m.span(1 if m.re.groups else 0) for run in runs for m in run])
+        return self._findings(text, spans)
+
+
+# Text exercising every regex family, parentheses included, for the trigger check below
+TRIGGER_SAMPLES = (
+    "Reported by: Mary Jane Smith, Dr. John Carter at Springfield General Hospital, Boston, MA 02115-1234. "
+    "Contact Alice Brown (555) 123-4567, Ph(555) 222-3333 or 555.987.6543, alice.brown@example.com, "
+    "SSN 123-45-6789, seen by Doctor Emily Stone.",
+    "On 03/14/2023 (ISO 2023-03-14), March 14, 2023 and Mar-14-23 the patient (MRN: AB12345, "
+    "Patient ID 99887766, Medical Record Number 1234567) at 42 Oak Street received 5 mg of aspirin, insulin 10 units.",
+    "Serial: SN-4421X, Lot# L2231 [(A12B3)], Transmitter Number TM-123456, Analyzer ID AN123456, FDA 123456, "
+    "K011111, part 1234AB, 3.5 mm type thread, 12.5 mm tube 8oz package, ISO 13485, cost: $1,250.00, 300 dollars, "
+    "contract value 50,000 for the proprietary formula, a trade secret and confidential manufacturing.",
+)
+
+assert all(MultiPatternScanner(list(PATTERN_FAMILIES), lambda text: False).trigger_agrees(sample)
+           for sample in TRIGGER_SAMPLES), "scanner trigger disagrees with PATTERN_FAMILIES"
+
+
+class KeywordSet:
+    """A trigger vocabulary compiled once; index(text) locates it in a text.
+
+    Occurrences are found in one regex pass (overlapping ones included), so the
+    cost per text does not grow with the number of keywords the way a
+    substring test per keyword per candidate does. whole_words=True only
+    counts keywords delimited by word boundaries.
+    """
+
+    def __init__(self, keywords: List[str], whole_words: bool = False):
+        self.keywords = sorted({k.lower() for k in keywords if k}, key=len)
+        self.whole_words = whole_words
+        # Shortest keyword first: at each position the shortest occurrence is
+        # the only one a proximity query needs
+        alternation = '|'.join(re.escape(k) for k in self.keywords)
+        if whole_words:
+            alternation = rf'\b(?:{alternation})\b'
+        self._regex = re.compile(f'(?=({alternation}))') if self.keywords else None
+
+    def index(self, text: str) -> 'KeywordIndex':
+        return KeywordIndex(text, self)
+
+
+class KeywordIndex:
+    """Keyword occurrences in one text, for "within N chars of a keyword" rules.
+
+    Occurrences are kept sorted by start with a suffix minimum of their ends,
+    so near() is one binary search.
+    """
+
+    def __init__(self, text: str, keyword_set: KeywordSet):
+        self.text_length = len(text)
+        self._starts = []
+        self._min_end = []
+        self._fallback = None
+        if keyword_set._regex is None:
+            return
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # a few characters change length when lowercased; check windows directly
+            self._fallback = (text, keyword_set)
+            return
+        ends = []
+        for m in keyword_set._regex.finditer(lowered):
+            self._starts.append(m.start())
+            ends.append(m.end(1))
+        running = None
+        for end in reversed(ends):
+            running = end if running is None else min(running, end)
+            self._min_end.append(running)
+        self._min_end.reverse()
+
+    def near(self, start: int, end: int, before: int, after: Optional[int] = None) -> bool:
+        """True if a keyword lies entirely within [start - before, end + after)"""
+        window_start = max(0, start - before)
+        window_end = min(self.text_length, end + (before if after is None else after))
+        if self._fallback is not None:
+            text, keyword_set = self._fallback
+            context = text[window_start:window_end].lower()
+            if keyword_set.whole_words:
+                return keyword_set._regex.search(context) is not None
+            return any(k in context for k in keyword_set.keywords)
+        i = bisect.bisect_left(self._starts, window_start)
+        return i < len(self._starts) and self._min_end[i] <= window_end
+
+
+class FindingIntervals:
+    """Sorted-interval index over findings for overlap questions.
+
+    Findings are sorted by start with a running maximum of their ends, so
+    "does [start, end) touch any finding" is two binary searches instead of a
+    scan over every finding. resolve() does the confidence-based overlap removal
+    in a single sweep over the findings.
+    """
+
+    def __init__(self, findings: List[Dict]):
+        ordered = sorted(findings, key=lambda x: x['start'])
+        self._starts = [f['start'] for f in ordered]
+        # _max_end[i] = largest end among the first i + 1 findings by start
+        self._max_end = []
+        running = None
+        for f in ordered:
+            running = f['end'] if running is None else max(running, f['end'])
+            self._max_end.append(running)
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """Same test as the old linear scan: some finding f has
+        f.start <= start < f.end, or f.start < end <= f.end, or start <= f.start < end."""
+        starts, max_end = self._starts, self._max_end
+        # start <= f.start < end
+        i = bisect.bisect_left(starts, start)
+        if i < len(starts) and starts[i] < end:
+            return True
+        # f.start <= start < f.end
+        i = bisect.bisect_right(starts, start)
+        if i and max_end[i - 1] > start:
+            return True
+        # f.start < end <= f.end
+        i = bisect.bisect_left(starts, end)
+        return bool(i) and max_end[i - 1] >= end
+
+    @staticmethod
+    def resolve(findings: List[Dict]) -> List[Dict]:
+        """Remove overlapping findings, keeping higher confidence ones.
+
+        Findings are visited by start. Each is compared with the earliest kept
+        finding it overlaps: a higher confidence replaces that one, otherwise it
+        is dropped. Kept findings that end before the current start can never
+        overlap again and are retired from the active set through a heap by end.
+        The active set stays in visiting order, i.e. by start, so the earliest
+        overlapping one is simply its first entry: O(1) per lookup and
+        O(n log n) overall, rather than a scan of everything kept so far.
+        """
+        kept = {}                  # seq -> finding, in the order they were kept
+        active = OrderedDict()     # seq -> finding still reachable by later starts
+        by_end = []                # heap of (end, seq) for retiring from active
+        seq = 0
+
+        for finding in sorted(findings, key=lambda x: x['start']):
+            start, end = finding['start'], finding['end']
+            while by_end and by_end[0][0] <= start:
+                active.pop(heapq.heappop(by_end)[1], None)
+
+            # Everything active starts at or before this finding and ends after
+            # its start, i.e. overlaps it (an empty finding also needs a strictly
+            # earlier start); the earliest kept one is the one compared against.
+            # Active is ordered by start, so if the first fails that strict test
+            # every later one does too
+            existing_seq = next(iter(active), None)
+            if existing_seq is not None and active[existing_seq]['start'] >= end:
+                existing_seq = None
+
+            if existing_seq is not None:
+                if finding['confidence'] > active[existing_seq]['confidence']:
+                    del active[existing_seq]
+                    del kept[existing_seq]
+                else:
+                    continue
+
+            kept[seq] = finding
+            active[seq] = finding
+            heapq.heappush(by_end, (end, seq))
+            seq += 1
+
+        return list(kept.values())
+
+
+# Streaming mode: characters read per chunk and context kept around each cut.
+# A window (chunk plus overlap on each side) stays under spaCy's default
+# max_length, so Presidio sees every window in one piece.
+STREAM_CHUNK_SIZE = 1 << 19
+STREAM_OVERLAP = 4096
+# Longest finding a stream window is guaranteed to see whole (an email address is
+# at most 254 characters); the overlap must also cover the widest context rule
+STREAM_MAX_MATCH = 256
+
+_WHITESPACE = re.compile(r'\s')
+
+
+class DetectionTable:
+    """Columnar findings from run_detection_batch.
+
+    Every column holds one value per finding; 'row' is the input's key (list
+    position, mapping key or Series index label). redacted holds one redacted
+    text per input, in input order.
+    """
+
+    COLUMNS = ('row', 'type', 'original', 'start', 'end', 'confidence', 'method',
+               'classification', 'category', 'description')
+
+    def __init__(self):
+        self.keys = []
+        self.redacted = []
+        self.columns = {column: [] for column in self.COLUMNS}
+        self._bounds = []   # (first, last + 1) finding positions per input
+
+    def add(self, key, redacted_text: str, findings: List[Dict]):
+        first = len(self)
+        self.keys.append(key)
+        self.redacted.append(redacted_text)
+        for finding in findings:
+            self.columns['row'].append(key)
+            for column in self.COLUMNS[1:]:
+                self.columns[column].append(finding[column])
+        self._bounds.append((first, len(self)))
+
+    def __len__(self):
+        return len(self.columns['row'])
+
+    def findings(self, position: int) -> List[Dict]:
+        """Findings of the input at `position` as dicts, like run_detection returns"""
+        first, last = self._bounds[position]
+        return [{column: self.columns[column][i] for column in self.COLUMNS[1:]} for i in range(first, last)]
+
+    def select(self, classification: str) -> Dict[str, list]:
+        """Columns restricted to one classification ('B4' or 'B6')"""
+        keep = [i for i, c in enumerate(self.columns['classification']) if c == classification]
+        return {column: [values[i] for i in keep] for column, values in self.columns.items()}
+
+    def counts(self) -> Dict[str, int]:
+        counts = {}
+        for classification in self.columns['classification']:
+            counts[classification] = counts.get(classification, 0) + 1
+        return counts
+
+    def to_dataframe(self):
+        """pandas DataFrame of the findings (pandas is only needed for this)"""
+        import pandas as pd
+        return pd.DataFrame(self.columns)
+
+
 class SimplifiedRedactionEngine:
-    def __init__(self, debug=False):
+    def __init__(self, debug=False, lexicon_files: Optional[Dict[str, List[str]]] = None,
+                 families: Optional[List[str]] = None, use_presidio: bool = True, profile: bool = False,
+                 regex_backend: str = 're', match_timeout: float = DEFAULT_MATCH_TIMEOUT,
+                 context_rules: Optional[Dict[str, Tuple[List[str], int]]] = None):
+        """lexicon_files maps a word-list family ('pharmaceuticals', 'profanity',
+        'manufacturers') to lexicon files whose terms extend the built-in list.
+        families restricts run_detection to those PATTERN_FAMILIES (default
+        DETECTION_ORDER); use_presidio=False never loads Presidio.
+        profile=True runs patterns one by one and collects per-pattern
+        statistics in self.profiler (slower; for tuning runs only).
+        regex_backend ('re', 're2', 'regex' or 'auto', see REGEX_BACKENDS) and
+        match_timeout choose how detector regexes are guarded against
+        catastrophic backtracking on hostile input.
+        context_rules overrides entries of CONTEXT_RULES, e.g. a larger
+        manufacturing trigger vocabulary or a wider window."""
         self.debug = debug
-        self.presidio_analyzer = None
-        
-        if PRESIDIO_AVAILABLE:
+        self.families = list(DETECTION_ORDER if families is None else families)
+        unknown = [f for f in self.families if f not in PATTERN_FAMILIES]
+        if unknown:
+            raise ValueError(f"Unknown detector families: {unknown}")
+        self.use_presidio = use_presidio and PRESIDIO_AVAILABLE
+        self._presidio_analyzer = None
+        self._presidio_loaded = False
+        self.extra_terms = {family: [term for path in paths for term in load_lexicon(path)]
+                            for family, paths in (lexicon_files or {}).items()}
+        self.regex_backend = resolve_regex_backend(regex_backend)
+        self.match_timeout = match_timeout
+        self.scanner = self._make_scanner(self.families)
+        self._family_scanners = {}
+        self._org_results = OrderedDict()   # text hash -> [(start, end, score), ...]
+        self.profiler = PatternProfiler() if profile else None
+        self._last_detection = (None, [])   # (text, findings) of the last detect_by_class call
+        rules = dict(CONTEXT_RULES, **(context_rules or {}))
+        self.context_rules = {name: (KeywordSet(keywords), window) for name, (keywords, window) in rules.items()}
+    
+    @property
+    def presidio_analyzer(self):
+        """Presidio AnalyzerEngine, created on first use (None if unavailable or disabled)"""
+        if not self._presidio_loaded and self.use_presidio:
+            self._presidio_loaded = True
             try:
-                self.presidio_analyzer = AnalyzerEngine()
+                from presidio_analyzer import AnalyzerEngine
+                self._presidio_analyzer = AnalyzerEngine()
                 self._debug_print("Presidio initialized")
             except Exception as e:
                 self._debug_print(f"Presidio initialization failed: {e}")
+        return self._presidio_analyzer
+    
+    @presidio_analyzer.setter
+    def presidio_analyzer(self, analyzer):
+        self._presidio_analyzer = analyzer
+        self._presidio_loaded = True
     
     def _debug_print(self, message: str):
         if self.debug:
@@ -121,365 +1093,152 @@ class SimplifiedRedactionEngine:
         
         return False
     
+    def _make_scanner(self, families: List[str]) -> MultiPatternScanner:
+        return MultiPatternScanner(families, self._is_false_positive, self.extra_terms,
+                                   self.regex_backend, self.match_timeout)
+    
+    def _scan_family(self, family: str, text: str) -> List[Dict]:
+        """Run a single pattern family (the per-detector entry points)"""
+        if family not in self._family_scanners:
+            self._family_scanners[family] = self._make_scanner([family])
+        return self._family_scanners[family].scan(text)
+    
     def detect_names(self, text: str) -> List[Dict]:
         """Detect person names with simple, reliable patterns"""
-        findings = []
-        
-        patterns = [
-            # Dr. + Name patterns
-            (r'\bDr\.?\s+([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,})', 0.95),
-            (r'\bDoctor\s+([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,})', 0.95),
-            
-            # Reporter names (with context)
-            (r'\b(?:Reporter|Reported\s+by|Contact)[-:\s]+([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,})', 0.9),
-            
-            # Simple two-word names (first + last)
-            (r'\b([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,})\b', 0.8),
-            
-            # Three-word names (first + middle + last)
-            (r'\b([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,}\s+[A-Z][a-z]{2,})\b', 0.85),
-        ]
-        
-        for pattern, confidence in patterns:
-            for match in re.finditer(pattern, text):
-                name = match.group(1) if match.groups() else match.group()
-                
-                # Skip if any word is a false positive
-                if any(self._is_false_positive(word) for word in name.split()):
-                    continue
-                
-                findings.append({
-                    'type': 'NAME',
-                    'original': name,
-                    'start': match.start(1) if match.groups() else match.start(),
-                    'end': match.end(1) if match.groups() else match.end(),
-                    'confidence': confidence,
-                    'method': 'name_pattern'
-                })
-        
-        return findings
-    
+        return self._scan_family('names', text)
+
     def detect_profanity(self, text: str) -> List[Dict]:
         """Detect profanity for redaction"""
-        findings = []
-        
-        for word in PROFANITY_WORDS:
-            pattern = rf'\b{re.escape(word)}\b'
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                detected_text = match.group()
-                
-                # Check false positives
-                if self._is_false_positive(detected_text):
-                    continue
-                
-                findings.append({
-                    'type': 'PROFANITY',
-                    'original': detected_text,
-                    'start': match.start(),
-                    'end': match.end(),
-                    'confidence': 0.99,
-                    'method': 'profanity_list'
-                })
-        
-        return findings
-    
+        return self._scan_family('profanity', text)
+
     def detect_financial_info(self, text: str) -> List[Dict]:
         """Detect commercial/financial information"""
-        findings = []
-        
-        patterns = [
-            # Currency amounts
-            (r'\$\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)', 0.85, 'FINANCIAL'),
-            (r'\b(\d{1,3}(?:,\d{3})*(?:\.\d{2})?\s*dollars?)\b', 0.85, 'FINANCIAL'),
-            
-            # Financial terms with amounts
-            (r'\b(?:cost|price|revenue|profit|loss|expense|budget|salary|wage)[-:\s]*\$?\s*(\d+(?:,\d{3})*(?:\.\d{2})?)', 0.9, 'FINANCIAL'),
-            
-            # Contract values
-            (r'\b(?:contract|agreement)\s+(?:value|amount)[-:\s]*\$?\s*(\d+(?:,\d{3})*)', 0.9, 'FINANCIAL'),
-            
-            # Commercial terms
-            (r'\b(proprietary\s+formula)\b', 0.8, 'COMMERCIAL'),
-            (r'\b(trade\s+secret)\b', 0.9, 'COMMERCIAL'),
-            (r'\b(confidential\s+manufacturing)\b', 0.85, 'COMMERCIAL'),
-        ]
-        
-        for pattern, confidence, detection_type in patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                amount = match.group(1) if match.groups() else match.group()
-                
-                # Check false positives
-                if self._is_false_positive(amount):
-                    continue
-                
-                findings.append({
-                    'type': detection_type,
-                    'original': amount,
-                    'start': match.start(1) if match.groups() else match.start(),
-                    'end': match.end(1) if match.groups() else match.end(),
-                    'confidence': confidence,
-                    'method': 'financial_pattern'
-                })
-        
-        return findings
-    
+        return self._scan_family('financial_info', text)
+
     def detect_locations(self, text: str) -> List[Dict]:
         """Detect cities, states, addresses, and facilities"""
-        findings = []
-        
-        patterns = [
-            # Facility names
-            (r'\b([A-Z][a-z]{2,}\s+(?:Hospital|Medical\s+Center|Clinic|Health\s+Center|Healthcare|Medical\s+Group))\b', 0.9, 'FACILITY'),
-            (r'\b([A-Z][a-z]{2,}\s+[A-Z][a-z]{2,}\s+(?:Hospital|Medical\s+Center|Clinic))\b', 0.9, 'FACILITY'),
-            
-            # City, State patterns
-            (r'\b([A-Z][a-z]{2,},\s*[A-Z][a-z]{2,})\b', 0.85, 'LOCATION'),
-            (r'\b([A-Z][a-z]{2,},\s*[A-Z]{2})\b', 0.9, 'LOCATION'),
-            
-            # Full addresses
-            (r'\b(\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Drive|Dr|Lane|Ln|Boulevard|Blvd))', 0.9, 'ADDRESS'),
-            
-            # ZIP codes
-            (r'\b(\d{5}(?:-\d{4})?)\b', 0.85, 'ZIP'),
-            
-            # State + ZIP combinations
-            (r'\b([A-Z]{2}\s+\d{5}(?:-\d{4})?)\b', 0.9, 'ADDRESS'),
-        ]
-        
-        for pattern, confidence, detection_type in patterns:
-            for match in re.finditer(pattern, text):
-                location = match.group(1)
-                
-                # Check false positives
-                if self._is_false_positive(location):
-                    continue
-                
-                findings.append({
-                    'type': detection_type,
-                    'original': location,
-                    'start': match.start(1),
-                    'end': match.end(1),
-                    'confidence': confidence,
-                    'method': 'location_pattern'
-                })
-        
-        return findings
-    
+        return self._scan_family('locations', text)
+
     def detect_contact_info(self, text: str) -> List[Dict]:
         """Detect phones, emails, etc."""
-        findings = []
-        
-        patterns = [
-            # Phone numbers
-            (r'\b(\(\d{3}\)\s*\d{3}[-.\s]*\d{4})\b', 0.95, 'PHONE'),
-            (r'\b(\d{3}[-.\s]*\d{3}[-.\s]*\d{4})\b', 0.9, 'PHONE'),
-            
-            # Email addresses
-            (r'\b([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})\b', 0.98, 'EMAIL'),
-            
-            # Social Security Numbers
-            (r'\b(\d{3}-\d{2}-\d{4})\b', 0.95, 'SSN'),
-        ]
-        
-        for pattern, confidence, detection_type in patterns:
-            for match in re.finditer(pattern, text):
-                detected_text = match.group(1)
-                
-                # Check false positives
-                if self._is_false_positive(detected_text):
-                    continue
-                
-                findings.append({
-                    'type': detection_type,
-                    'original': detected_text,
-                    'start': match.start(1),
-                    'end': match.end(1),
-                    'confidence': confidence,
-                    'method': 'contact_pattern'
-                })
-        
-        return findings
-    
+        return self._scan_family('contact_info', text)
+
     def detect_dates(self, text: str) -> List[Dict]:
         """Detect various date formats"""
-        findings = []
-        
-        patterns = [
-            # MM/DD/YYYY, MM-DD-YYYY
-            (r'\b(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})\b', 0.85),
-            
-            # ISO dates (YYYY-MM-DD)
-            (r'\b(\d{4}-\d{1,2}-\d{1,2})\b', 0.9),
-            
-            # Month DD, YYYY
-            (r'\b((?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4})\b', 0.9),
-            
-            # Abbreviated months
-            (r'\b((?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[-.\s]+\d{1,2}[-.\s]+\d{2,4})\b', 0.85),
-        ]
-        
-        for pattern, confidence in patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                date_str = match.group(1)
-                
-                # Check false positives
-                if self._is_false_positive(date_str):
-                    continue
-                
-                # Basic validation for MM/DD/YYYY format
-                if '/' in date_str or '-' in date_str:
-                    parts = re.split(r'[-/]', date_str)
-                    if len(parts) == 3:
-                        try:
-                            if len(parts[0]) <= 2:  # MM/DD/YYYY format
-                                month, day, year = int(parts[0]), int(parts[1]), int(parts[2])
-                                if month > 12 or day > 31 or year < 1900 or year > 2030:
-                                    continue
-                        except ValueError:
-                            continue
-                
-                findings.append({
-                    'type': 'DATE',
-                    'original': date_str,
-                    'start': match.start(1),
-                    'end': match.end(1),
-                    'confidence': confidence,
-                    'method': 'date_pattern'
-                })
-        
-        return findings
-    
+        return self._scan_family('dates', text)
+
     def detect_medical_ids(self, text: str) -> List[Dict]:
         """Detect medical record numbers and IDs"""
-        findings = []
-        
-        patterns = [
-            # Medical Record Numbers
-            (r'\b(MRN[-:\s]*[A-Z0-9-]{5,})\b', 0.95, 'MEDICAL_ID'),
-            (r'\b(Medical\s+Record\s+Number[-:\s]*[A-Z0-9-]{5,})\b', 0.95, 'MEDICAL_ID'),
-            
-            # Patient IDs
-            (r'\b(Patient\s+ID[-:\s]*[A-Z0-9-]{5,})\b', 0.9, 'MEDICAL_ID'),
-            
-            # Generic ID patterns (more conservative)
-            (r'\b([A-Z]{2,3}-\d{6,})\b', 0.8, 'ID'),
-            (r'\b(\d{8,12})\b', 0.7, 'ID'),  # Long number sequences
-        ]
-        
-        for pattern, confidence, detection_type in patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                detected_text = match.group(1)
-                
-                # Check false positives
-                if self._is_false_positive(detected_text):
-                    continue
-                
-                findings.append({
-                    'type': detection_type,
-                    'original': detected_text,
-                    'start': match.start(1),
-                    'end': match.end(1),
-                    'confidence': confidence,
-                    'method': 'medical_id_pattern'
-                })
-        
-        return findings
-    
+        return self._scan_family('medical_ids', text)
+
     def detect_pharmaceuticals(self, text: str) -> List[Dict]:
         """Detect pharmaceutical names and medical devices"""
-        findings = []
-        
-        # Known pharmaceuticals (exact match)
-        for drug in PHARMACEUTICAL_NAMES:
-            pattern = rf'\b{re.escape(drug)}\b'
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                detected_text = match.group()
-                
-                # Check false positives
-                if self._is_false_positive(detected_text):
-                    continue
-                
-                findings.append({
-                    'type': 'PHARMACEUTICAL',
-                    'original': detected_text,
-                    'start': match.start(),
-                    'end': match.end(),
-                    'confidence': 0.9,
-                    'method': 'known_pharmaceutical'
-                })
-        
-        # Drug dosage patterns
-        dosage_patterns = [
-            (r'\b([A-Za-z]+\s+\d+\s?(?:mg|ml|mcg|g|units?|cc))\b', 0.8),
-            (r'\b(\d+\s?(?:mg|ml|mcg|g|units?|cc)\s+of\s+[A-Za-z]+)\b', 0.8),
-        ]
-        
-        for pattern, confidence in dosage_patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                detected_text = match.group(1)
-                
-                # Check false positives
-                if self._is_false_positive(detected_text):
-                    continue
-                
-                findings.append({
-                    'type': 'PHARMACEUTICAL',
-                    'original': detected_text,
-                    'start': match.start(1),
-                    'end': match.end(1),
-                    'confidence': confidence,
-                    'method': 'dosage_pattern'
-                })
-        
-        return findings
-    
+        return self._scan_family('pharmaceuticals', text)
+
+    def detect_manufacturers(self, text: str) -> List[Dict]:
+        """Detect known manufacturer names"""
+        return self._scan_family('manufacturers', text)
+
     def detect_manufacturing_info(self, text: str) -> List[Dict]:
         """Detect manufacturing numbers, lot numbers, serial numbers, transmitter/analyzer IDs"""
-        findings = []
-        
-        patterns = [
-            # Serial/Model/Lot numbers with labels
-            (r'\b(?:Serial|SN|S/N|Model|Part|P/N|Lot|Batch)[-:\s]*([A-Z0-9-]{4,})\b', 0.9, 'MANUFACTURING_NUMBER'),
-            
-            # Transmitter and Analyzer numbers (FDA specific)
-            (r'\b(?:Transmitter|Analyzer)[-:\s]*(?:Number|#|ID)[-:\s]*([A-Z0-9-]{4,})\b', 0.95, 'TRANSMITTER_ANALYZER'),
-            (r'\b(TM[-]?\d{6,})\b', 0.9, 'TRANSMITTER_ANALYZER'),
-            (r'\b(AN[-]?\d{6,})\b', 0.9, 'TRANSMITTER_ANALYZER'),
+        return self._scan_family('manufacturing_info', text)
+
+    def _org_candidates(self, text: str, existing_index: FindingIntervals) -> List[Tuple[str, int, int]]:
+        """Capitalized words our regex missed that sit in manufacturing/company context"""
+        candidates = []
+        keywords, window = self.context_rules['manufacturing']
+        context = keywords.index(text)
+        capitalized_pattern = r'\b[A-Z][a-z]{2,}\b'
+        for match in re.finditer(capitalized_pattern, text):
+            word = match.group()
+            start, end = match.start(), match.end()
             
-            # Regulatory/Registration numbers
-            (r'\b([A-Z]{1,3}\d{5,})\b', 0.9, 'REGULATORY_NUMBER'),  # K011111, FDA12345
-            (r'\bFDA[-\s]*(\d{6,})\b', 0.95, 'REGULATORY_NUMBER'),
-            (r'\b(K\d{6})\b', 0.95, 'REGULATORY_NUMBER'),  # FDA clearance numbers
+            # Skip if already found by regex or is false positive
+            if (self._is_false_positive(word) or 
+                self._already_found_by_existing(start, end, existing_index)):
+                continue
             
-            # Manufacturing specifications (technical measurements)
-            (r'\b(\d+\.?\d*\s*mm\s+.*?\s+\d+oz\s+package)\b', 0.85, 'MANUFACTURING_SPEC'),
-            (r'\b(\d+\.?\d*\s*mm\s+type\s+thread)\b', 0.85, 'MANUFACTURING_SPEC'),
-            (r'\b(\d+oz\s+package)\b', 0.8, 'MANUFACTURING_SPEC'),
-            (r'\b(ISO\s+\d+)\b', 0.8, 'MANUFACTURING_SPEC'),  # ISO standards
+            # Check if word is in manufacturing/company context
+            if context.near(start, end, window):
+                candidates.append((word, start, end))
+        return candidates
+    
+    def _presidio_max_chars(self) -> int:
+        """Longest text the Presidio spaCy model accepts in one call"""
+        models = getattr(getattr(self.presidio_analyzer, 'nlp_engine', None), 'nlp', None)
+        model = models.get('en') if isinstance(models, dict) else None
+        return min(PRESIDIO_MAX_CHARS, getattr(model, 'max_length', PRESIDIO_MAX_CHARS))
+    
+    def _score_org_candidates(self, batch: List[Tuple[str, List[Tuple[str, int, int]]]]) -> List[Dict[str, float]]:
+        """ORG score per candidate word for [(text, candidates), ...], one dict per text.
+
+        Presidio runs once over each text that has candidates (through its batch
+        analyzer when there are several, in pieces under the model's max_length
+        for very long texts), and each word gets the best ORG score overlapping
+        any of its occurrences in that text. Results are remembered per text, so
+        a repeated field costs nothing and scores never depend on other texts.
+        """
+        keys = [hashlib.sha256(text.encode('utf-8')).hexdigest() if candidates else None
+                for text, candidates in batch]
+        pending = {}
+        for key, (text, _) in zip(keys, batch):
+            if key is not None and key not in self._org_results:
+                pending[key] = text
+        
+        if pending:
+            limit = self._presidio_max_chars()
+            pieces = [(key, offset, piece) for key, text in pending.items()
+                      for offset, piece in split_for_nlp(text, limit)]
+            texts = [piece for _, _, piece in pieces]
+            try:
+                try:
+                    from presidio_analyzer import BatchAnalyzerEngine
+                except ImportError:  # older Presidio releases
+                    BatchAnalyzerEngine = None
+                if len(texts) > 1 and BatchAnalyzerEngine is not None:
+                    batch_analyzer = BatchAnalyzerEngine(analyzer_engine=self.presidio_analyzer)
+                    results = list(batch_analyzer.analyze_iterator(texts, language='en', entities=['ORG']))
+                else:
+                    results = [self.presidio_analyzer.analyze(text, entities=['ORG'], language='en') for text in texts]
+            except Exception as e:
+                self._debug_print(f"Presidio error: {e}")
+                results = None
             
-            # Standalone alphanumeric codes
-            (r'\b([A-Z]{2,}\d{4,})\b', 0.7, 'MANUFACTURING_NUMBER'),
-            (r'\b(\d{4,}[A-Z]{2,})\b', 0.7, 'MANUFACTURING_NUMBER'),
-            (r'\b([A-Z]\d+[A-Z]+\d*)\b', 0.75, 'MANUFACTURING_NUMBER'),  # A123B, X1Y2Z3
-        ]
+            if results is not None:
+                spans = {key: [] for key in pending}
+                for (key, offset, _), piece_results in zip(pieces, results):
+                    spans[key].extend((offset + r.start, offset + r.end, r.score) for r in piece_results)
+                for key, key_spans in spans.items():
+                    self._org_results[key] = key_spans
+                while len(self._org_results) > ORG_RESULT_CACHE_SIZE:
+                    self._org_results.popitem(last=False)
         
-        for pattern, confidence, detection_type in patterns:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                detected_text = match.group(1) if match.groups() else match.group()
-                
-                # Check false positives
-                if self._is_false_positive(detected_text):
-                    continue
-                
+        scores = []
+        for key, (_, candidates) in zip(keys, batch):
+            spans = self._org_results.get(key, [])
+            if spans:
+                self._org_results.move_to_end(key)
+            text_scores = {}
+            for word, start, end in candidates:
+                best = max((score for s, e, score in spans if s < end and e > start), default=0.0)
+                text_scores[word] = max(text_scores.get(word, 0.0), best)
+            scores.append(text_scores)
+        return scores
+    
+    def _org_findings(self, candidates: List[Tuple[str, int, int]], scores: Dict[str, float]) -> List[Dict]:
+        findings = []
+        for word, start, end in candidates:
+            score = scores.get(word, 0.0)
+            if score > 0.6:
                 findings.append({
-                    'type': detection_type,
-                    'original': detected_text,
-                    'start': match.start(1) if match.groups() else match.start(),
-                    'end': match.end(1) if match.groups() else match.end(),
-                    'confidence': confidence,
-                    'method': 'manufacturing_pattern'
+                    'type': 'ORGANIZATION',
+                    'original': word,
+                    'start': start,
+                    'end': end,
+                    'confidence': score * 0.8,  # Reduce confidence slightly
+                    'method': 'presidio_targeted'
                 })
-        
+                self._debug_print(f"Presidio caught company name: {word}")
         return findings
     
     def detect_targeted_presidio(self, text: str, existing_findings: List[Dict]) -> List[Dict]:
@@ -487,51 +1246,23 @@ class SimplifiedRedactionEngine:
         if not self.presidio_analyzer:
             return []
         
-        findings = []
+        existing_index = FindingIntervals(existing_findings)
         
-        # 1. Find capitalized words our regex missed
-        capitalized_pattern = r'\b[A-Z][a-z]{2,}\b'
-        for match in re.finditer(capitalized_pattern, text):
-            word = match.group()
-            start, end = match.start(), match.end()
-            
-            # Skip if already found by regex or is false positive
-            if (self._is_false_positive(word) or 
-                self._already_found_by_existing(start, end, existing_findings)):
-                continue
-            
-            # Check if word is in manufacturing/company context
-            context_start = max(0, start - 30)
-            context_end = min(len(text), end + 30)
-            context = text[context_start:context_end].lower()
-            
-            manufacturing_triggers = [
-                'manufacturer', 'company', 'made by', 'produced by', 'distributor',
-                'supplier', 'corporation', 'inc', 'ltd', 'llc', 'contacted'
-            ]
-            
-            if any(trigger in context for trigger in manufacturing_triggers):
-                # Run Presidio ORG detection on just this word
-                try:
-                    word_results = self.presidio_analyzer.analyze(
-                        word, entities=['ORG'], language='en'
-                    )
-                    
-                    if word_results and word_results[0].score > 0.6:
-                        findings.append({
-                            'type': 'ORGANIZATION',
-                            'original': word,
-                            'start': start,
-                            'end': end,
-                            'confidence': word_results[0].score * 0.8,  # Reduce confidence slightly
-                            'method': 'presidio_targeted'
-                        })
-                        self._debug_print(f"Presidio caught company name: {word}")
-                
-                except Exception as e:
-                    self._debug_print(f"Presidio error on word '{word}': {e}")
+        # 1. Capitalized words our regex missed, scored by one Presidio pass over the text
+        candidates = self._org_candidates(text, existing_index)
+        scores, = self._score_org_candidates([(text, candidates)])
+        findings = self._org_findings(candidates, scores)
+        
+        # 2. Alphanumeric sequences our patterns missed
+        findings.extend(self._regulatory_codes(text, existing_index))
         
-        # 2. Find remaining alphanumeric sequences our patterns missed
+        return findings
+    
+    def _regulatory_codes(self, text: str, existing_index: FindingIntervals) -> List[Dict]:
+        """Find remaining alphanumeric sequences our patterns missed"""
+        findings = []
+        keywords, window = self.context_rules['regulatory']
+        context = keywords.index(text)
         alphanumeric_patterns = [
             r'\b[A-Z]{1,2}\d{4,}[A-Z]*\b',    # K011111, AB1234C
             r'\b\d{2,}[A-Z]{2,}\d*\b',        # 123ABC, 45XYZ789
@@ -544,20 +1275,11 @@ class SimplifiedRedactionEngine:
                 
                 # Skip if already found or is false positive
                 if (self._is_false_positive(code) or 
-                    self._already_found_by_existing(start, end, existing_findings)):
+                    self._already_found_by_existing(start, end, existing_index)):
                     continue
                 
                 # Check if in regulatory/technical context
-                context_start = max(0, start - 20)
-                context_end = min(len(text), end + 20)
-                context = text[context_start:context_end].lower()
-                
-                regulatory_triggers = [
-                    'registration', 'clearance', 'approval', 'fda', 'model',
-                    'serial', 'part', 'regulatory', 'compliance'
-                ]
-                
-                if any(trigger in context for trigger in regulatory_triggers):
+                if context.near(start, end, window):
                     findings.append({
                         'type': 'REGULATORY_NUMBER',
                         'original': code,
@@ -570,40 +1292,18 @@ class SimplifiedRedactionEngine:
         
         return findings
     
-    def _already_found_by_existing(self, start: int, end: int, existing_findings: List[Dict]) -> bool:
-        """Check if position range overlaps with existing findings"""
-        for finding in existing_findings:
-            if (finding['start'] <= start < finding['end'] or 
-                finding['start'] < end <= finding['end'] or
-                start <= finding['start'] < end):
-                return True
-        return False
+    def _already_found_by_existing(self, start: int, end: int, existing_findings) -> bool:
+        """Check if position range overlaps with existing findings (a list or a FindingIntervals)"""
+        if not isinstance(existing_findings, FindingIntervals):
+            existing_findings = FindingIntervals(existing_findings)
+        return existing_findings.overlaps(start, end)
     
     def remove_overlaps(self, findings: List[Dict]) -> List[Dict]:
         """Remove overlapping findings, keeping higher confidence ones"""
         if not findings:
             return findings
         
-        # Sort by start position
-        sorted_findings = sorted(findings, key=lambda x: x['start'])
-        
-        filtered = []
-        for finding in sorted_findings:
-            # Check if this finding overlaps with any existing ones
-            overlaps = False
-            for existing in filtered:
-                if (finding['start'] < existing['end'] and finding['end'] > existing['start']):
-                    # Overlap detected - keep the higher confidence one
-                    if finding['confidence'] > existing['confidence']:
-                        filtered.remove(existing)
-                    else:
-                        overlaps = True
-                    break
-            
-            if not overlaps:
-                filtered.append(finding)
-        
-        return filtered
+        return FindingIntervals.resolve(findings)
     
     def classify_findings(self, findings: List[Dict]) -> List[Dict]:
         """Classify findings into B4/B6 categories"""
@@ -635,24 +1335,183 @@ class SimplifiedRedactionEngine:
         
         return classified
     
+    def detect_by_class(self, text: str) -> Dict[str, List[Dict]]:
+        """B4 and B6 findings of one text; asking again for the same text reuses the detection pass"""
+        last = self._last_detection   # one read, so a concurrent call can't mix texts and findings
+        if last[0] != text:
+            _, findings = self.run_detection(text)
+            last = self._last_detection = (text, findings)
+        by_class = {'B4': [], 'B6': []}
+        for finding in last[1]:
+            by_class.setdefault(finding['classification'], []).append(dict(finding))
+        return by_class
+    
     def run_detection(self, text: str) -> Tuple[str, List[Dict]]:
         """Run complete detection on text"""
         all_findings = []
         
         self._debug_print("=== SIMPLIFIED DETECTION ENGINE ===")
         
-        # Run all detection methods
-        all_findings.extend(self.detect_names(text))
-        all_findings.extend(self.detect_locations(text))
-        all_findings.extend(self.detect_contact_info(text))
-        all_findings.extend(self.detect_dates(text))
-        all_findings.extend(self.detect_medical_ids(text))
-        all_findings.extend(self.detect_pharmaceuticals(text))
-        all_findings.extend(self.detect_manufacturing_info(text))
-        all_findings.extend(self.detect_profanity(text))
-        all_findings.extend(self.detect_financial_info(text))
-        all_findings.extend(self.detect_targeted_presidio(text, all_findings))
+        # Run all regex detectors in one pass over the text
+        all_findings.extend(self._raw_findings(text))
+        
+        return self._finalize(text, all_findings)
+    
+    def _raw_findings(self, text: str) -> List[Dict]:
+        """Regex and targeted Presidio findings, before overlap resolution"""
+        if self.profiler is None:
+            findings = self.scanner.scan(text)
+            findings.extend(self.detect_targeted_presidio(text, findings))
+            return findings
+        
+        findings = self.scanner.scan_profiled(text, self.profiler)
+        start_time = time.perf_counter()
+        targeted = self.detect_targeted_presidio(text, findings)
+        elapsed = time.perf_counter() - start_time
+        for method in ('presidio_targeted', 'alphanumeric_pattern'):
+            matched = [f for f in targeted if f['method'] == method]
+            for finding in matched:
+                finding['pattern_id'] = f"targeted[{method}]"
+            # the two targeted passes share one timing, booked on the first
+            self.profiler.record_scan(f"targeted[{method}]", 'targeted_presidio', method,
+                                      elapsed if method == 'presidio_targeted' else 0.0, len(matched))
+        findings.extend(targeted)
+        self.profiler.record_findings(findings)
+        return findings
+    
+    def run_detection_batch(self, texts, batch_size: int = 1000) -> DetectionTable:
+        """Run complete detection on many texts in one go.
+
+        texts may be a list, a generator, a mapping (field id -> text) or a
+        pandas Series; rows are keyed by position, mapping key or index label.
+        Non-string values (NaN) count as empty text. Regex detection runs over
+        each chunk of batch_size texts in one pass, and Presidio over each chunk
+        through its batch analyzer.
+        """
+        table = DetectionTable()
+        items = iter(texts.items() if hasattr(texts, 'items') else enumerate(texts))
+        while True:
+            chunk = list(itertools.islice(items, batch_size))
+            if not chunk:
+                break
+            keys = [key for key, _ in chunk]
+            chunk_texts = [text if isinstance(text, str) else '' for _, text in chunk]
+            
+            if self.profiler is not None:
+                raw = [self._raw_findings(text) for text in chunk_texts]
+            else:
+                raw = self.scanner.scan_batch(chunk_texts)
+            if self.presidio_analyzer and self.profiler is None:
+                indexes = [FindingIntervals(findings) for findings in raw]
+                candidates = [self._org_candidates(text, index) for text, index in zip(chunk_texts, indexes)]
+                scores = self._score_org_candidates(list(zip(chunk_texts, candidates)))
+                for findings, text, index, cands, text_scores in zip(raw, chunk_texts, indexes, candidates, scores):
+                    findings.extend(self._org_findings(cands, text_scores) + self._regulatory_codes(text, index))
+            
+            for key, text, findings in zip(keys, chunk_texts, raw):
+                table.add(key, *self._finalize(text, findings))
+        
+        self._debug_print(f"BATCH RESULTS: {len(table.keys)} texts, {len(table)} findings, {table.counts()}")
+        return table
+    
+    @staticmethod
+    def _apply_redactions(text: str, findings: List[Dict], offset: int = 0) -> str:
+        """Replace each finding with its [REDACTED_Bx] tag; offset is where text starts"""
+        ordered = sorted(findings, key=lambda x: x['start'])
+        if any(a['end'] > b['start'] for a, b in zip(ordered, ordered[1:])):
+            # Overlapping spans: keep the right-to-left slicing they always got
+            redacted_text = text
+            for finding in reversed(ordered):
+                start, end = finding['start'] - offset, finding['end'] - offset
+                replacement = f"[REDACTED_{finding['classification']}]"
+                redacted_text = redacted_text[:start] + replacement + redacted_text[end:]
+            return redacted_text
         
+        pieces = []
+        pos = 0
+        for finding in ordered:
+            pieces.append(text[pos:finding['start'] - offset])
+            pieces.append(f"[REDACTED_{finding['classification']}]")
+            pos = finding['end'] - offset
+        pieces.append(text[pos:])
+        return ''.join(pieces)
+    
+    def redact_stream(self, reader, writer, chunk_size: int = STREAM_CHUNK_SIZE,
+                      overlap: int = STREAM_OVERLAP, on_findings=None) -> Dict[str, int]:
+        """Redact a text stream chunk by chunk with bounded memory.
+
+        Detection runs over a window of about chunk_size characters plus
+        `overlap` characters on each side. Output is written up to a cut point
+        `overlap` characters before the end of the window, moved forward past
+        any finding that straddles it and on to the next whitespace; everything
+        after the cut is scanned again with the next window, so matches crossing
+        a chunk boundary are found once. Findings starting before the cut were
+        already written and are dropped from the next window.
+
+        on_findings, if given, receives each window's committed findings with
+        absolute offsets. Returns counts per classification.
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if overlap < self.min_stream_overlap():
+            raise ValueError(f"overlap must be at least {self.min_stream_overlap()} characters, "
+                             "or matches crossing a chunk boundary are missed")
+        counts = {'B4': 0, 'B6': 0}
+        buf = ''
+        buf_start = 0   # absolute offset of buf[0]
+        done = 0        # absolute offset written so far
+        eof = False
+        
+        while True:
+            while not eof and buf_start + len(buf) - done < chunk_size + overlap:
+                data = reader.read(chunk_size + overlap - (buf_start + len(buf) - done))
+                eof = not data
+                buf += data
+            lo = done - buf_start
+            if eof and lo >= len(buf):
+                break
+            
+            findings = self._raw_findings(buf)
+            findings = [f for f in self.remove_overlaps(findings) if f['start'] >= lo]
+            cut = len(buf) if eof else self._stream_cut(buf, findings, len(buf) - overlap)
+            committed = self.classify_findings([f for f in findings if f['start'] < cut])
+            if self.profiler is not None:
+                self.profiler.record_kept(committed)
+            
+            writer.write(self._apply_redactions(buf[lo:cut], committed, offset=lo))
+            for finding in committed:
+                finding['start'] += buf_start
+                finding['end'] += buf_start
+                counts[finding['classification']] = counts.get(finding['classification'], 0) + 1
+            if on_findings and committed:
+                on_findings(committed)
+            self._debug_print(f"Stream: wrote up to {buf_start + cut}, {len(committed)} findings")
+            
+            done = buf_start + cut
+            # keep some text before the cut as left context for the next window
+            keep_from = max(0, cut - overlap)
+            buf = buf[keep_from:]
+            buf_start += keep_from
+        
+        return counts
+    
+    def min_stream_overlap(self) -> int:
+        """Smallest redact_stream overlap that still sees every match whole, with its context"""
+        return STREAM_MAX_MATCH + max(window for _, window in self.context_rules.values())
+    
+    @staticmethod
+    def _stream_cut(text: str, findings: List[Dict], cut: int) -> int:
+        """Move the cut past findings that straddle it and on to whitespace"""
+        while True:
+            new_cut = max([cut] + [f['end'] for f in findings if f['start'] < cut])
+            space = _WHITESPACE.search(text, new_cut)
+            new_cut = space.start() if space else len(text)
+            if new_cut == cut:
+                return cut
+            cut = new_cut
+    
+    def _finalize(self, text: str, all_findings: List[Dict]) -> Tuple[str, List[Dict]]:
+        """Resolve overlaps, classify and redact the raw findings of one text"""
         self._debug_print(f"Total raw findings: {len(all_findings)}")
         
         # Remove overlaps
@@ -661,14 +1520,11 @@ class SimplifiedRedactionEngine:
         
         # Classify findings
         classified_findings = self.classify_findings(unique_findings)
+        if self.profiler is not None:
+            self.profiler.record_kept(classified_findings)
         
         # Apply redactions
-        redacted_text = text
-        for finding in reversed(sorted(classified_findings, key=lambda x: x['start'])):
-            start, end = finding['start'], finding['end']
-            classification = finding['classification']
-            replacement = f'[REDACTED_{classification}]'
-            redacted_text = redacted_text[:start] + replacement + redacted_text[end:]
+        redacted_text = self._apply_redactions(text, classified_findings)
         
         # Summary
         b4_count = len([f for f in classified_findings if f['classification'] == 'B4'])
@@ -677,58 +1533,117 @@ class SimplifiedRedactionEngine:
         
         return redacted_text, classified_findings
 
-# Global instance
-simplified_engine = SimplifiedRedactionEngine()
+# Global instance, built on first use
+_default_engine = None
+
+def get_engine() -> SimplifiedRedactionEngine:
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = SimplifiedRedactionEngine()
+    return _default_engine
+
+def __getattr__(name):
+    # Keeps `simplified_engine` importable without building it at import time
+    if name == 'simplified_engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Compatibility functions for existing web app
 def run_3500a_redaction(extracted_fields: Dict[str, str]) -> Tuple[Dict[str, str], List[Dict]]:
     all_findings = []
     redacted_fields = {}
     
-    for field_id, content in extracted_fields.items():
-        if not content.strip():
-            redacted_fields[field_id] = content
-            continue
-        
-        redacted_content, field_findings = simplified_engine.run_detection(content)
-        for finding in field_findings:
+    table = get_engine().run_detection_batch(extracted_fields)
+    for position, field_id in enumerate(table.keys):
+        for finding in table.findings(position):
             finding['field'] = field_id
             all_findings.append(finding)
-        redacted_fields[field_id] = redacted_content
+        redacted_fields[field_id] = table.redacted[position]
     
     return redacted_fields, all_findings
 
+def detect_content_by_class(text: str) -> Dict[str, List[Dict]]:
+    """B4 and B6 findings of one text from a single detection pass (shared by
+    detect_b4_content and detect_b6_content on the same text)"""
+    return get_engine().detect_by_class(text)
+
 def detect_b4_content(text: str) -> List[Dict]:
-    _, findings = simplified_engine.run_detection(text)
-    return [f for f in findings if f['classification'] == 'B4']
+    return detect_content_by_class(text)['B4']
 
 def detect_b6_content(text: str) -> List[Dict]:
-    _, findings = simplified_engine.run_detection(text)
-    return [f for f in findings if f['classification'] == 'B6']
+    return detect_content_by_class(text)['B6']
 
 def main():
-    if len(sys.argv) < 3:
-        print("Usage: python3 simplified_redaction.py input_file output_file")
-        return 1
+    parser = argparse.ArgumentParser(description="Redact B4/B6 content from a text file")
+    parser.add_argument("input_file")
+    parser.add_argument("output_file")
+    parser.add_argument("--stream", action="store_true",
+                        help="Process the file in overlapping chunks with bounded memory (for very large files)")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE, help="Characters per chunk in --stream mode")
+    parser.add_argument("--overlap", type=int, default=STREAM_OVERLAP, help="Context characters around chunk seams in --stream mode")
+    parser.add_argument("--findings", help="Also write findings as JSON lines to this file")
+    parser.add_argument("--profile", nargs="?", const="", metavar="CSV",
+                        help="Print a per-pattern cost/yield report (optionally also saved as CSV)")
+    parser.add_argument("--profile-sort", default="seconds", choices=PatternProfiler.COLUMNS[2:],
+                        help="Column to sort the profile report by")
+    parser.add_argument("--regex-backend", default="re", choices=("auto",) + REGEX_BACKENDS,
+                        help="Regex engine for the detectors; re2/regex guard against catastrophic backtracking")
+    parser.add_argument("--match-timeout", type=float, default=DEFAULT_MATCH_TIMEOUT,
+                        help="Seconds per pattern per text with --regex-backend regex")
+    args = parser.parse_args()
+    
+    if args.profile is not None or args.regex_backend != "re":
+        global _default_engine
+        _default_engine = SimplifiedRedactionEngine(profile=args.profile is not None,
+                                                    regex_backend=args.regex_backend,
+                                                    match_timeout=args.match_timeout)
+    
+    if args.stream and args.overlap < get_engine().min_stream_overlap():
+        parser.error(f"--overlap must be at least {get_engine().min_stream_overlap()}")
     
     try:
-        with open(sys.argv[1], 'r', encoding='utf-8') as f:
-            content = f.read()
+        print(f"Processing: {args.input_file}")
+        findings_out = open(args.findings, 'w', encoding='utf-8') if args.findings else None
         
-        print(f"Processing: {sys.argv[1]}")
-        redacted_content, findings = simplified_engine.run_detection(content)
+        def write_findings(findings):
+            if findings_out:
+                for finding in findings:
+                    findings_out.write(json.dumps(finding) + "\n")
         
-        with open(sys.argv[2], 'w', encoding='utf-8') as f:
-            f.write(redacted_content)
+        try:
+            if args.stream:
+                with open(args.input_file, 'r', encoding='utf-8') as reader, \
+                        open(args.output_file, 'w', encoding='utf-8') as writer:
+                    counts = get_engine().redact_stream(reader, writer, args.chunk_size, args.overlap, write_findings)
+                b4_count, b6_count = counts.get('B4', 0), counts.get('B6', 0)
+            else:
+                with open(args.input_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                
+                redacted_content, findings = get_engine().run_detection(content)
+                
+                with open(args.output_file, 'w', encoding='utf-8') as f:
+                    f.write(redacted_content)
+                write_findings(findings)
+                
+                b4_count = len([f for f in findings if f['classification'] == 'B4'])
+                b6_count = len([f for f in findings if f['classification'] == 'B6'])
+        finally:
+            if findings_out:
+                findings_out.close()
         
         print(f"✅ Simplified redaction completed!")
         
         # Show results breakdown
-        b4_count = len([f for f in findings if f['classification'] == 'B4'])
-        b6_count = len([f for f in findings if f['classification'] == 'B6'])
         print(f"🏭 B4 (Trade Secret): {b4_count} items")
         print(f"🏥 B6 (Patient/Medical): {b6_count} items")
         
+        profiler = get_engine().profiler
+        if profiler is not None:
+            print(profiler.report(sort_by=args.profile_sort))
+            if args.profile:
+                profiler.to_csv(args.profile, sort_by=args.profile_sort)
+        
         return 0
     except Exception as e:
         print(f"❌ Error: {str(e)}")
@@ -16,8 +16,19 @@ Dependencies (pip):
 
 CLI usage:
   python PDF_PII_redactor_v11_noui.py input.pdf --out out.pdf
+  python PDF_PII_redactor_v11_noui.py input.pdf --out out.pdf --batch-size 64
   python PDF_PII_redactor_v11_noui.py input.pdf --out out.pdf --tags tags.json
   python PDF_PII_redactor_v11_noui.py ./docs --outdir ./results --batch --tags tags.json
+  python PDF_PII_redactor_v11_noui.py ./docs --outdir ./results --batch --workers 8
+  python PDF_PII_redactor_v11_noui.py ./docs --outdir ./results --batch --jsonl > audit.jsonl
+
+Batch runs are resumable: --outdir keeps a manifest.jsonl keyed by input SHA-256,
+model name and the tags/pattern hashes. Unchanged inputs are skipped on rerun;
+pass --force to redo everything.
+
+Warm daemon (load models once, then millisecond-overhead per-file calls):
+  python PDF_PII_redactor_v11_noui.py --serve [/tmp/clara_redactor.sock]
+  python PDF_PII_redactor_v11_noui.py input.pdf --out out.pdf --tags tags.json --client
 
 User tags JSON (optional):
 {
@@ -38,7 +49,7 @@ Notes:
 """
 
 from __future__ import annotations
-import io, json, re, sys, argparse, hashlib
+import io, json, re, sys, time, hashlib
 from pathlib import Path
 from typing import Dict, Any, List, Tuple, Optional
 
@@ -46,34 +57,9 @@ import fitz  # PyMuPDF
 
 # ---------------- NLP setup ----------------
 
-MODELS_TO_TRY = ["en_core_web_trf", "en_core_web_lg", "en_core_web_md", "en_core_web_sm"]
-
-# Minimal example patterns; extend as needed
-ENTITY_RULER_PATTERNS: List[Dict[str, Any]] = [
-    {"label": "SSN", "pattern": [{"TEXT": {"REGEX": r"^\d{3}-\d{2}-\d{4}$"}}]},
-    {"label": "SSN", "pattern": [{"TEXT": {"REGEX": r"^\d{3}$"}}, {"TEXT":"-"}, {"TEXT": {"REGEX": r"^\d{2}$"}}, {"TEXT":"-"}, {"TEXT": {"REGEX": r"^\d{4}$"}}]},
-    {"label": "DATE", "pattern": [{"IS_DIGIT": True}, {"LOWER": {"REGEX":"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)"}}, {"IS_DIGIT": True}]},
-    # Simplified address-like pattern (number + words + state + zip)
-    {"label": "ADDRESS", "pattern": [{"TEXT": {"REGEX": r"^\d{3,6}$"}}, {"IS_ALPHA": True, "OP":"+"}, {"IS_ALPHA": True, "OP":"?"},
-                                     {"IS_ALPHA": True, "OP":"+"}, {"IS_PUNCT": True, "OP":"?"},
-                                     {"IS_ALPHA": True, "LENGTH": 2}, {"IS_PUNCT": True, "OP":"?"},
-                                     {"IS_DIGIT": True, "LENGTH": 5}]},
-]
-
-def load_nlp(models: List[str] = None):
-    import spacy
-    from spacy.pipeline import EntityRuler
-    models = models or MODELS_TO_TRY
-    last_err = None
-    for m in models:
-        try:
-            nlp = spacy.load(m, disable=["lemmatizer"])
-            ruler = nlp.add_pipe("entity_ruler", before="ner") if "ner" in nlp.pipe_names else nlp.add_pipe("entity_ruler")
-            ruler.add_patterns(ENTITY_RULER_PATTERNS)
-            return nlp, m
-        except Exception as e:
-            last_err = e
-    raise RuntimeError(f"Failed to load any spaCy model {models}: {last_err}")
+# Model loading, EntityRuler patterns, skip rules and span analysis live in the shared core
+from redaction_core import (MODELS_TO_TRY, PATTERNS as ENTITY_RULER_PATTERNS, DEFAULT_BATCH_SIZE,
+                            SKIP_LABELS, ProgressCallback, analyze_many, load_nlp)
 
 # ---------------- Spell & Grammar (optional) ----------------
 
@@ -124,22 +110,10 @@ def apply_grammar(tool, text: str) -> str:
 # ---------------- Redaction helpers ----------------
 
 USER_LABELS = {"B4": "trade secret", "B6": "patient info", "OTHER": "redacted"}
-SKIP_LABELS = {"CARDINAL", "QUANTITY", "PERCENT"}
-
-def build_auto_spans(doc) -> List[Tuple[int,int,str]]:
-    # Your skip rules from the Streamlit code
-    spans = []
-    for ent in doc.ents:
-        if ent.label_ in SKIP_LABELS:
-            continue
-        if ent.label_ in {"FAC", "GPE"} and any(e.label_ == "ADDRESS" for e in doc.ents):
-            continue
-        if ent.label_ == "PERSON" and any(ch.isdigit() for ch in ent.text):
-            continue
-        if ent.label_ == "DATE" and not re.search(r"(19|20)\d{2}", ent.text):
-            continue
-        spans.append((ent.start_char, ent.end_char, f"[{ent.label_}]"))
-    return spans
+
+def detect_spans(nlp, texts: List[str], batch_size: int = DEFAULT_BATCH_SIZE) -> List[List[Dict[str, Any]]]:
+    """Text in, labelled character spans out (same skip rules as the PDF path), one nlp.pipe pass."""
+    return [analysis.entity_dicts() for analysis in analyze_many(nlp, texts, batch_size=batch_size)]
 
 def merge_redactions(text: str, auto_spans: List[Tuple[int,int,str]], user_tags: List[Dict[str,Any]]) -> str:
     spans: List[Dict[str, Any]] = []
@@ -191,63 +165,185 @@ def redact_full_pdf_bytes(
     nlp=None,
     sym=None,
     lt_tool=None,
-    user_tags: Optional[Dict[str,Any]] = None
+    user_tags: Optional[Dict[str,Any]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[ProgressCallback] = None
 ) -> Tuple[bytes, Dict[str, Any]]:
-    """Returns (final_pdf_bytes, audit_dict)."""
+    """Returns (final_pdf_bytes, audit_dict).
+
+    Runs in three phases so NER is batched per document:
+      1. collect every text field (with its page/field context) and normalize it
+      2. one nlp.pipe pass over all collected texts (redaction_core.analyze_many)
+      3. merge spans with user tags and write the results back to the widgets
+
+    The audit times phase 2 (ner_seconds) and the span merge (merge_seconds) separately.
+
+    If given, progress(stage, info) is called as work completes; stages are
+    PROGRESS_STAGES in order and info carries "done"/"total" counts.
+    """
+    report = progress or (lambda stage, info: None)
     if nlp is None:
         nlp, model_name = load_nlp()
     else:
         model_name = getattr(nlp, "meta", {}).get("name", "custom")
 
     doc = fitz.open(input_pdf)
+    page_count = doc.page_count
     updated = 0
     auto_count = 0
     user_count = 0
 
-    # Iterate AcroForm fields; if none, no-op (you can extend to text redaction via redaction annots)
-    for page_index in range(doc.page_count):
+    # Phase 1: collect field texts; if none, no-op (you can extend to text redaction via redaction annots)
+    fields: List[Dict[str, Any]] = []
+    for page_index in range(page_count):
         page = doc[page_index]
-        widgets = page.widgets() or []
-        for w in widgets:
+        for w in page.widgets() or []:
             text = w.field_value or ""
             if not text or not isinstance(text, str):
                 continue
-
-            # optional normalization passes
-            text2 = apply_spelling(sym, text)
-            text2 = apply_grammar(lt_tool, text2)
-
-            # NLP + entity ruler
-            doc_ent = nlp(text2)
-            auto_spans = build_auto_spans(doc_ent)
-            auto_count += len(auto_spans)
-
-            # User tags for this field/page
-            tags = _tags_for_field(user_tags, w.field_name, page_index)
-            user_count += len(tags or [])
-
-            redacted = merge_redactions(text2, auto_spans, tags)
-
-            if redacted != text:
-                w.field_value = redacted
-                w.update()
-                updated += 1
+            fields.append({
+                "page": page_index,
+                "field_name": w.field_name,
+                "xref": w.xref,
+                "text": text,
+            })
+        report("extract", {"done": page_index + 1, "total": page_count, "fields": len(fields)})
+
+    # optional normalization passes
+    for n, f in enumerate(fields, 1):
+        text2 = apply_spelling(sym, f["text"])
+        f["text2"] = apply_grammar(lt_tool, text2)
+        report("correct", {"done": n, "total": len(fields)})
+
+    # Phase 2: NLP + entity ruler, batched over the whole document (analyses hold spans only)
+    t0 = time.perf_counter()
+    analyses = []
+    for i, analysis in enumerate(analyze_many(nlp, (f["text2"] for f in fields), batch_size=batch_size)):
+        analyses.append(analysis)
+        report("ner", {"done": i + 1, "total": len(fields)})
+    ner_seconds = time.perf_counter() - t0
+
+    # Merge auto spans with user tags
+    t0 = time.perf_counter()
+    results: Dict[Tuple[int, int], str] = {}
+    for f, analysis in zip(fields, analyses):
+        auto_spans = analysis.auto_spans()
+        auto_count += len(auto_spans)
+
+        # User tags for this field/page
+        tags = _tags_for_field(user_tags, f["field_name"], f["page"])
+        user_count += len(tags or [])
+
+        redacted = merge_redactions(f["text2"], auto_spans, tags)
+        if redacted != f["text"]:
+            results[(f["page"], f["xref"])] = redacted
+    merge_seconds = time.perf_counter() - t0
+
+    # Phase 3: write back
+    for page_index in sorted({p for p, _ in results}):
+        page = doc[page_index]
+        for w in page.widgets() or []:
+            redacted = results.get((page_index, w.xref))
+            if redacted is None:
+                continue
+            w.field_value = redacted
+            w.update()
+            updated += 1
+            report("write", {"done": updated, "total": len(results)})
 
     # Save to bytes
     out_buf = io.BytesIO()
     doc.save(out_buf)
     doc.close()
+    report("save", {"done": 1, "total": 1, "bytes": out_buf.getbuffer().nbytes})
 
     audit = {
         "nlp_model": model_name,
         "entities_auto_spans": auto_count,
         "user_tags_count": user_count,
         "fields_updated": updated,
-        "pages": doc.page_count if doc else None
+        "fields_analyzed": len(fields),
+        "ner_batch_size": batch_size,
+        "ner_seconds": round(ner_seconds, 4),
+        "merge_seconds": round(merge_seconds, 4),
+        "pages": page_count
     }
     return out_buf.getvalue(), audit
 
-# ---------------- CLI ----------------
+# ---------------- Warm daemon ----------------
+
+DEFAULT_SOCKET = "/tmp/clara_redactor.sock"
+
+def serve(socket_path: str, nlp, model_name: str, sym=None, lt_tool=None,
+          batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+    """Keep the engines warm and answer redaction requests on a local Unix socket.
+
+    Protocol: one JSON object per line in each direction.
+      request:  {"input": "in.pdf", "out": "out.pdf", "tags": {...} | null}
+      response: {"ok": true, "model": ..., "out": ..., "audit": {...}}
+                {"ok": false, "error": "..."}
+    """
+    import os, socket, socketserver, stat
+
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    req = json.loads(line)
+                    if not req.get("input") or not req.get("out"):
+                        raise ValueError("request needs 'input' and 'out'")
+                    data, audit = redact_full_pdf_bytes(Path(req["input"]), nlp=nlp, sym=sym, lt_tool=lt_tool,
+                                                        user_tags=req.get("tags"), batch_size=batch_size)
+                    Path(req["out"]).write_bytes(data)
+                    resp = {"ok": True, "model": model_name, "out": req["out"], "audit": audit}
+                except Exception as e:
+                    resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                self.wfile.write((json.dumps(resp) + "\n").encode("utf-8"))
+                self.wfile.flush()
+
+    if os.path.exists(socket_path):
+        # Only remove a stale socket left by a daemon that died; never a live one or a regular file
+        if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            raise SystemExit(f"{socket_path} exists and is not a socket; refusing to replace it")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socket_path)
+            except ConnectionRefusedError:
+                os.unlink(socket_path)
+            except FileNotFoundError:
+                pass  # went away meanwhile
+            else:
+                raise SystemExit(f"Another daemon is already serving on {socket_path}")
+    with socketserver.UnixStreamServer(socket_path, _Handler) as server:
+        print(f"Serving {model_name} on {socket_path} (Ctrl+C to stop)", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+def request_redaction(socket_path: str, input_pdf: str, out_pdf: str,
+                      user_tags: Optional[Dict[str,Any]] = None) -> Dict[str, Any]:
+    """Thin client for serve(): send one job, return the daemon's JSON response."""
+    import socket
+    req = {"input": str(Path(input_pdf).resolve()), "out": str(Path(out_pdf).resolve()), "tags": user_tags}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(socket_path)
+        s.sendall((json.dumps(req) + "\n").encode("utf-8"))
+        with s.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise RuntimeError(f"No response from redaction daemon at {socket_path}")
+    return json.loads(line)
+
+# ---------------- Resumable batch manifest ----------------
+
+MANIFEST_NAME = "manifest.jsonl"
+# Bump when redaction output changes for the same model/tags/patterns; invalidates cached results
+ENGINE_VERSION = "11.0"
 
 def _sha256(p: Path) -> str:
     h = hashlib.sha256()
@@ -256,48 +352,258 @@ def _sha256(p: Path) -> str:
             h.update(chunk)
     return h.hexdigest()
 
+def _sha256_json(obj: Any) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True).encode("utf-8")).hexdigest()
+
+def resolve_model_name(models: List[str] = None) -> str:
+    """Name of the model load_nlp() would pick, without loading it."""
+    import spacy
+    for m in models or MODELS_TO_TRY:
+        if spacy.util.is_package(m):
+            return m
+    return "unknown"
+
+def config_fingerprint(model_name: str, user_tags: Optional[Dict[str,Any]]) -> Dict[str, str]:
+    return {
+        "engine": ENGINE_VERSION,
+        "model": model_name,
+        "tags_sha256": _sha256_json(user_tags),
+        "patterns_sha256": _sha256_json({"ruler": ENTITY_RULER_PATTERNS, "skip": sorted(SKIP_LABELS)}),
+    }
+
+def manifest_key(input_sha256: str, fingerprint: Dict[str, str]) -> str:
+    return hashlib.sha256(
+        f"{input_sha256}:{fingerprint['engine']}:{fingerprint['model']}:"
+        f"{fingerprint['tags_sha256']}:{fingerprint['patterns_sha256']}".encode("utf-8")
+    ).hexdigest()
+
+def load_manifest(outdir: Path) -> Dict[str, Dict[str, Any]]:
+    """Read the append-only manifest; later lines win, a torn last line is ignored."""
+    entries: Dict[str, Dict[str, Any]] = {}
+    path = outdir / MANIFEST_NAME
+    if not path.exists():
+        return entries
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry["key"]] = entry
+    return entries
+
+def append_manifest(outdir: Path, entry: Dict[str, Any]) -> None:
+    with (outdir / MANIFEST_NAME).open("a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # An interrupted run never leaves a half-written PDF that looks complete
+    tmp = path.with_name(path.name + ".part")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+def batch_output_path(outdir: Path, pdf: Path) -> Path:
+    return outdir / f"{pdf.stem}.redacted.pdf"
+
+def _reuse_output(entry: Dict[str, Any], out_pdf: Path) -> bool:
+    """True if out_pdf holds the recorded output, copying it there from the entry's file if need be."""
+    if out_pdf.exists() and _sha256(out_pdf) == entry["sha256"]:
+        return True
+    # Same bytes seen before under another name: copy that output rather than redo it
+    src = Path(entry["out"])
+    if src.resolve() != out_pdf.resolve() and src.exists() and _sha256(src) == entry["sha256"]:
+        _write_atomic(out_pdf, src.read_bytes())
+        return True
+    return False
+
+def plan_batch(pdfs: List[Path], outdir: Path, fingerprint: Dict[str, str],
+               manifest: Dict[str, Dict[str, Any]], on_skip) -> List[Tuple[Path, str]]:
+    """Return the [(pdf, input_sha256)] still to do; already-done inputs go to on_skip(record).
+
+    An input is done when the manifest has its content + config and its own
+    <stem>.redacted.pdf in outdir holds the recorded output (a renamed or
+    duplicated input gets a copy of the earlier output).
+    """
+    todo = []
+    for pdf in pdfs:
+        input_sha = _sha256(pdf)
+        entry = manifest.get(manifest_key(input_sha, fingerprint))
+        out_pdf = batch_output_path(outdir, pdf)
+        if entry and _reuse_output(entry, out_pdf):
+            on_skip({"file": str(pdf), "out": str(out_pdf), "sha256": entry["sha256"],
+                     "audit": entry["audit"], "skipped": True})
+        else:
+            todo.append((pdf, input_sha))
+    return todo
+
+def record_result(outdir: Path, record: Dict[str, Any], input_sha256: str,
+                  fingerprint: Dict[str, str]) -> None:
+    """Add a finished input under the same fingerprint plan_batch checked it with."""
+    append_manifest(outdir, {
+        "key": manifest_key(input_sha256, fingerprint),
+        "input_sha256": input_sha256,
+        **fingerprint,
+        "file": record["file"],
+        "out": record["out"],
+        "sha256": record["sha256"],
+        "audit": record["audit"],
+    })
+
+# ---------------- Process-pool batch ----------------
+
+# Per-worker engines, filled once by _init_worker in each pool process
+_WORKER: Dict[str, Any] = {}
+
+def _init_worker(no_spell: bool, no_grammar: bool, batch_size: int,
+                 user_tags: Optional[Dict[str,Any]], models: Optional[List[str]] = None) -> None:
+    nlp, model_name = load_nlp(models)
+    _WORKER.update(
+        nlp=nlp,
+        model_name=model_name,
+        sym=None if no_spell else build_symspell(),
+        lt_tool=None if no_grammar else build_grammarlang(),
+        batch_size=batch_size,
+        user_tags=user_tags,
+    )
+
+def _redact_to_file(pdf: str, out_pdf: str) -> Dict[str, Any]:
+    """Pool task: PDFs travel by path, only the small result record comes back."""
+    data, audit = redact_full_pdf_bytes(Path(pdf), nlp=_WORKER["nlp"], sym=_WORKER["sym"],
+                                        lt_tool=_WORKER["lt_tool"], user_tags=_WORKER["user_tags"],
+                                        batch_size=_WORKER["batch_size"])
+    _write_atomic(Path(out_pdf), data)
+    return {"file": pdf, "out": out_pdf, "sha256": hashlib.sha256(data).hexdigest(), "audit": audit}
+
+def redact_batch_parallel(todo: List[Tuple[Path, str]], outdir: Path, workers: int, no_spell: bool = False,
+                          no_grammar: bool = False, batch_size: int = DEFAULT_BATCH_SIZE,
+                          user_tags: Optional[Dict[str,Any]] = None, model_name: Optional[str] = None):
+    """Yield (result record, input_sha256) in completion order from a pool of warm worker processes.
+
+    model_name pins every worker to that model (no fallback), so results match the fingerprint it was planned with.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    models = [model_name] if model_name else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(no_spell, no_grammar, batch_size, user_tags, models)) as pool:
+        futures = {pool.submit(_redact_to_file, str(pdf), str(batch_output_path(outdir, pdf))): (pdf, sha)
+                   for pdf, sha in todo}
+        for fut in as_completed(futures):
+            pdf, sha = futures[fut]
+            try:
+                yield fut.result(), sha
+            except Exception as e:
+                yield {"file": str(pdf), "error": f"{type(e).__name__}: {e}"}, sha
+
+# ---------------- CLI ----------------
+
+def _emit_jsonl(record: Dict[str, Any]) -> None:
+    # One line per PDF, flushed so `tail -f` / pipes see it immediately
+    sys.stdout.write(json.dumps(record) + "\n")
+    sys.stdout.flush()
+
 def main():
     import argparse
     ap = argparse.ArgumentParser(description="Run redaction (NLP+user tags) without Streamlit.")
-    ap.add_argument("input", help="PDF path or directory of PDFs")
+    ap.add_argument("input", nargs="?", help="PDF path or directory of PDFs")
     ap.add_argument("--out", help="Output PDF path (single-file mode)")
     ap.add_argument("--outdir", help="Output directory (batch mode)")
     ap.add_argument("--batch", action="store_true", help="Treat input as directory and process all PDFs")
     ap.add_argument("--tags", help="Path to optional user tags JSON")
     ap.add_argument("--no-spell", action="store_true")
     ap.add_argument("--no-grammar", action="store_true")
+    ap.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                    help="Number of field texts per nlp.pipe batch (default: %(default)s)")
+    ap.add_argument("--serve", nargs="?", const=DEFAULT_SOCKET, metavar="SOCKET",
+                    help="Load engines once and serve requests on a Unix socket (default: %(const)s)")
+    ap.add_argument("--client", nargs="?", const=DEFAULT_SOCKET, metavar="SOCKET",
+                    help="Send this job to a running --serve daemon instead of loading engines")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Batch mode: number of worker processes, each with its own warm models")
+    ap.add_argument("--force", action="store_true",
+                    help=f"Batch mode: ignore {MANIFEST_NAME} in --outdir and redo every input")
+    ap.add_argument("--jsonl", action="store_true",
+                    help="Batch mode: print one JSON record per PDF as soon as it finishes")
     args = ap.parse_args()
+    if not args.serve and not args.input:
+        ap.error("input is required unless --serve is given")
 
     # Load optional user tags
     user_tags = None
     if args.tags:
         user_tags = json.loads(Path(args.tags).read_text(encoding="utf-8"))
 
+    if args.client:
+        if not args.out:
+            raise SystemExit("--out is required for client mode")
+        resp = request_redaction(args.client, args.input, args.out, user_tags)
+        print(json.dumps(resp, indent=2))
+        if not resp.get("ok"):
+            raise SystemExit(1)
+        return
+
+    in_path = Path(args.input) if args.input else None
+    batch_mode = bool(in_path) and (args.batch or in_path.is_dir())
+
+    if batch_mode:
+        outdir = Path(args.outdir or "./results")
+        outdir.mkdir(parents=True, exist_ok=True)
+        manifest = {} if args.force else load_manifest(outdir)
+        pdfs = sorted(in_path.glob("*.pdf"))
+        # --jsonl streams each record and keeps nothing; otherwise collect for one final document
+        results: List[Dict[str, Any]] = []
+        emit = _emit_jsonl if args.jsonl else results.append
+
+    if batch_mode and args.workers > 1:
+        # Resolved once here; the workers load exactly this model and results are recorded under this fingerprint
+        model_name = resolve_model_name()
+        if model_name == "unknown":
+            raise SystemExit(f"No spaCy model found (tried {', '.join(MODELS_TO_TRY)})")
+        fingerprint = config_fingerprint(model_name, user_tags)
+        todo = plan_batch(pdfs, outdir, fingerprint, manifest, emit)
+        for rec, input_sha in redact_batch_parallel(todo, outdir, args.workers,
+                                                    no_spell=args.no_spell, no_grammar=args.no_grammar,
+                                                    batch_size=args.batch_size, user_tags=user_tags,
+                                                    model_name=model_name):
+            if "audit" in rec:
+                record_result(outdir, rec, input_sha, fingerprint)
+            emit(rec)
+        if not args.jsonl:
+            print(json.dumps({"model": model_name, "count": len(results), "results": results}, indent=2))
+        return
+
     # Build engines once
     nlp, model_name = load_nlp()
     sym = None if args.no_spell else build_symspell()
     lt_tool = None if args.no_grammar else build_grammarlang()
 
-    in_path = Path(args.input)
-    if args.batch or in_path.is_dir():
-        outdir = Path(args.outdir or "./results")
-        outdir.mkdir(parents=True, exist_ok=True)
-        results = []
-        for pdf in sorted(in_path.glob("*.pdf")):
-            data, audit = redact_full_pdf_bytes(pdf, nlp=nlp, sym=sym, lt_tool=lt_tool, user_tags=user_tags)
-            out_pdf = outdir / f"{pdf.stem}.redacted.pdf"
-            out_pdf.write_bytes(data)
-            results.append({
+    if args.serve:
+        serve(args.serve, nlp, model_name, sym=sym, lt_tool=lt_tool, batch_size=args.batch_size)
+        return
+
+    if batch_mode:
+        fingerprint = config_fingerprint(model_name, user_tags)
+        todo = plan_batch(pdfs, outdir, fingerprint, manifest, emit)
+        for pdf, input_sha in todo:
+            data, audit = redact_full_pdf_bytes(pdf, nlp=nlp, sym=sym, lt_tool=lt_tool, user_tags=user_tags,
+                                                batch_size=args.batch_size)
+            out_pdf = batch_output_path(outdir, pdf)
+            _write_atomic(out_pdf, data)
+            rec = {
                 "file": str(pdf),
                 "out": str(out_pdf),
-                "sha256": _sha256(out_pdf),
+                "sha256": hashlib.sha256(data).hexdigest(),
                 "audit": audit
-            })
-        print(json.dumps({"model": model_name, "count": len(results), "results": results}, indent=2))
+            }
+            record_result(outdir, rec, input_sha, fingerprint)
+            emit(rec)
+        if not args.jsonl:
+            print(json.dumps({"model": model_name, "count": len(results), "results": results}, indent=2))
     else:
         if not args.out:
             raise SystemExit("--out is required for single-file mode")
-        data, audit = redact_full_pdf_bytes(in_path, nlp=nlp, sym=sym, lt_tool=lt_tool, user_tags=user_tags)
+        data, audit = redact_full_pdf_bytes(in_path, nlp=nlp, sym=sym, lt_tool=lt_tool, user_tags=user_tags,
+                                            batch_size=args.batch_size)
         Path(args.out).write_bytes(data)
         print(json.dumps({"model": model_name, "out": args.out, "audit": audit}, indent=2))
 
@@ -0,0 +1,40 @@
+"""
+redaction_core
+--------------
+The redaction engine shared by the Streamlit app (PDF_PII_redactor_v11.2.py),
+the no-UI CLI (PDF_PII_redactor_v11_noui.py) and the API workers.
+
+It owns the spaCy model loading, the EntityRuler pattern set, the NER skip
+rules and the span writer. A text is analysed once into a FieldAnalysis and a
+whole upload into a DocumentAnalysis; callers read entities, kept entities,
+redacted text and spans from those objects instead of re-running NER.
+An AnalysisCache keyed by text hash, model and pattern version makes repeated
+texts free across pages, sessions and processes. Analyses hold spans only,
+never spaCy Docs; the in-memory span cache is a ByteLRU with a byte budget.
+BackgroundAnalyzer runs analyze_pdf on a worker thread per upload hash and
+publishes each field as soon as it is done.
+
+    from redaction_core import load_nlp, analyze, analyze_pdf
+    nlp, model_name = load_nlp()
+    result = analyze_pdf(pdf_bytes, nlp, correct=my_corrector)
+    for f in result:
+        print(f.display_name, f.redacted)
+"""
+
+from .patterns import MODELS_TO_TRY, PATTERNS, analysis_version, load_nlp, patterns_version
+from .analysis import (DEFAULT_BATCH_SIZE, SKIP_LABELS, Entity, FieldAnalysis,
+                       analyze, analyze_many, kept_ents, text_key, write_spans)
+from .document import (PROGRESS_STAGES, DocumentAnalysis, FieldResult, ProgressCallback,
+                       analyze_pdf, medwatch_display_name)
+from .cache import DEFAULT_SPANS_BYTES, AnalysisCache, ByteLRU, user_cache_path
+from .background import AnalysisJob, BackgroundAnalyzer, upload_key
+
+__all__ = [
+    "MODELS_TO_TRY", "PATTERNS", "analysis_version", "load_nlp", "patterns_version",
+    "DEFAULT_BATCH_SIZE", "SKIP_LABELS", "Entity", "FieldAnalysis",
+    "analyze", "analyze_many", "kept_ents", "text_key", "write_spans",
+    "PROGRESS_STAGES", "DocumentAnalysis", "FieldResult", "ProgressCallback",
+    "analyze_pdf", "medwatch_display_name",
+    "DEFAULT_SPANS_BYTES", "AnalysisCache", "ByteLRU", "user_cache_path",
+    "AnalysisJob", "BackgroundAnalyzer", "upload_key",
+]
@@ -0,0 +1,130 @@
+"""
+Skip rules, span writer and the per-text analysis object.
+
+NER runs once per text; everything the UI pages, the CLI and the API need
+afterwards (all entities, the entities kept by the skip rules, the redacted
+text, character spans) is read off the FieldAnalysis.
+"""
+
+from __future__ import annotations
+import hashlib
+import hmac
+import itertools
+import re
+from collections import namedtuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .patterns import analysis_version
+
+# Texts per nlp.pipe batch; trf benefits from larger batches on GPU, keep modest on CPU
+DEFAULT_BATCH_SIZE = 32
+
+SKIP_LABELS = {"CARDINAL", "QUANTITY", "PERCENT"}
+_YEAR = re.compile(r"(19|20)\d{2}")
+
+# Same attribute names as a spaCy Span, so pages can use either interchangeably
+Entity = namedtuple("Entity", "start_char end_char text label_")
+
+def text_key(version: str, text: str, secret: Optional[bytes] = None) -> str:
+    """Cache key of a text's analysis under one model/pattern version.
+
+    With a secret the key is an HMAC-SHA256, so stored keys cannot be matched
+    against guessed texts (names, MRNs, dates) without that secret.
+    """
+    data = f"{version}\0{text}".encode("utf-8")
+    if secret is not None:
+        return hmac.new(secret, data, hashlib.sha256).hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+def kept_ents(ents: Iterable) -> Iterable:
+    """Entities that survive the skip rules (works on doc.ents or Entity tuples)."""
+    ents = list(ents)
+    has_address = any(e.label_ == "ADDRESS" for e in ents)
+    for ent in ents:
+        if ent.label_ in SKIP_LABELS:
+            continue
+        if ent.label_ in {"FAC", "GPE"} and has_address:
+            continue
+        if ent.label_ == "PERSON" and any(ch.isdigit() for ch in ent.text):
+            continue
+        if ent.label_ == "DATE" and not _YEAR.search(ent.text):
+            continue  # Only redact if actual date string
+        yield ent
+
+def write_spans(text: str, ents: Iterable) -> str:
+    """Replace each entity's text with its [LABEL] tag, padded to keep the field length."""
+    for ent in ents:
+        text = text.replace(ent.text, f"[{ent.label_}]{' ' * max(0, len(ent.text) - len(ent.label_) - 2)}")
+    return text
+
+class FieldAnalysis:
+    """NER result for one text: every entity, the kept ones and the redacted text.
+
+    Holds plain spans only, never the spaCy Doc, so keeping one per field per
+    session costs a few hundred bytes instead of the Doc's tensors.
+    """
+
+    __slots__ = ("text", "ents", "kept", "_redacted")
+
+    def __init__(self, text: str, ents: Iterable[Entity]):
+        self.text = text
+        self.ents = tuple(ents)
+        self.kept = tuple(kept_ents(self.ents))
+        self._redacted = None
+
+    @classmethod
+    def from_doc(cls, doc) -> "FieldAnalysis":
+        return cls(doc.text, [Entity(e.start_char, e.end_char, e.text, e.label_) for e in doc.ents])
+
+    @property
+    def redacted(self) -> str:
+        if self._redacted is None:
+            self._redacted = write_spans(self.text, self.kept)
+        return self._redacted
+
+    def auto_spans(self) -> List[Tuple[int, int, str]]:
+        return [(e.start_char, e.end_char, f"[{e.label_}]") for e in self.kept]
+
+    def entity_dicts(self) -> List[Dict[str, Any]]:
+        return [{"start": e.start_char, "end": e.end_char, "label": e.label_, "text": e.text} for e in self.kept]
+
+def analyze(nlp, text: str, cache=None) -> FieldAnalysis:
+    return next(analyze_many(nlp, [text], cache=cache))
+
+def analyze_many(nlp, texts: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                 cache=None) -> Iterator[FieldAnalysis]:
+    """One nlp.pipe pass over all texts; yields results in input order as batches finish.
+
+    texts is consumed lazily, one batch at a time; batch_size=1 makes every
+    result available as soon as its own text is analysed.
+
+    With an AnalysisCache, texts already analysed by this model and pattern set
+    (and repeats within texts) skip NER; only the rest go through nlp.pipe.
+    Docs are dropped as soon as their spans are read.
+    """
+    if cache is None:
+        for doc in nlp.pipe(texts, batch_size=batch_size):
+            yield FieldAnalysis.from_doc(doc)
+        return
+
+    version = analysis_version(nlp)
+
+    # Batch by batch, so results still stream and the input is read lazily
+    texts = iter(texts)
+    done: Dict[str, FieldAnalysis] = {}
+    while True:
+        chunk = list(itertools.islice(texts, batch_size))
+        if not chunk:
+            return
+        for text in chunk:
+            if text not in done:
+                hit = cache.get(version, text)
+                if hit is not None:
+                    done[text] = hit
+        # Misses in first-occurrence order, so the pipe output lines up with the loop below
+        parsed = nlp.pipe(list(dict.fromkeys(t for t in chunk if t not in done)), batch_size=batch_size)
+        for text in chunk:
+            if text not in done:
+                done[text] = FieldAnalysis.from_doc(next(parsed))
+                cache.put(version, done[text])
+            yield done[text]
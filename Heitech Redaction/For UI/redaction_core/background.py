@@ -0,0 +1,127 @@
+"""
+Background analysis of uploads, keyed by upload hash.
+
+A UI submits the PDF bytes and gets an AnalysisJob back at once. The PDF is
+analysed on a worker thread one field at a time, and each finished field
+(B5, then D10-n, then H11 for a 3500A) appears on the job straight away, so
+review can start on it while the rest is still running. Submitting the same
+upload again, from any session, returns the existing job.
+"""
+
+from __future__ import annotations
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .document import DocumentAnalysis, FieldResult, analyze_pdf
+
+def upload_key(pdf_bytes: bytes, *options: Any) -> str:
+    """SHA-256 of the upload plus anything else that changes the result (e.g. correction levels)."""
+    h = hashlib.sha256(pdf_bytes)
+    for option in options:
+        h.update(f"\0{option!r}".encode("utf-8"))
+    return h.hexdigest()
+
+class AnalysisJob:
+    """One upload being analysed; read fields/progress at any time, result once done."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.result: Optional[DocumentAnalysis] = None
+        self.error: Optional[str] = None
+        self._fields: List[FieldResult] = []
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def ready_fields(self) -> List[FieldResult]:
+        """Fields analysed so far, in document order."""
+        with self._lock:
+            return list(self._fields)
+
+    def progress(self) -> Dict[str, Dict[str, Any]]:
+        """Latest progress info per stage reached so far (see PROGRESS_STAGES)."""
+        with self._lock:
+            return {stage: dict(info) for stage, info in self._progress.items()}
+
+    def partial(self) -> DocumentAnalysis:
+        """The finished DocumentAnalysis, or the fields ready so far (no PDF bytes yet)."""
+        return self.result if self.result is not None else DocumentAnalysis(self.ready_fields())
+
+    def _report(self, stage: str, info: Dict[str, Any]) -> None:
+        with self._lock:
+            self._progress[stage] = info
+
+    def _add_field(self, field: FieldResult) -> None:
+        with self._lock:
+            self._fields.append(field)
+
+class BackgroundAnalyzer:
+    """Worker thread(s) running analyze_pdf for submitted uploads.
+
+    One worker by default: jobs queue behind each other instead of sharing
+    the model between concurrent threads. Finished jobs are kept, up to
+    max_jobs, so reopening an upload is instant.
+    """
+
+    def __init__(self, nlp, cache=None, max_workers: int = 1, max_jobs: int = 32):
+        self.nlp = nlp
+        self.cache = cache
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clara-analysis")
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, pdf_bytes: bytes, key: Optional[str] = None,
+               correct: Optional[Callable[[str], str]] = None, **kwargs) -> AnalysisJob:
+        """Start analysing an upload, or return the job already running/finished for it.
+
+        kwargs go to analyze_pdf (e.g. select); a failed job is replaced on resubmit.
+        """
+        key = key or upload_key(pdf_bytes)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.error is None:
+                self._jobs.move_to_end(key)
+                return job
+            job = AnalysisJob(key)
+            self._jobs[key] = job
+            self._trim()
+        self._executor.submit(self._run, job, pdf_bytes, correct, kwargs)
+        return job
+
+    def get(self, key: Optional[str]) -> Optional[AnalysisJob]:
+        with self._lock:
+            return self._jobs.get(key) if key else None
+
+    def forget(self, key: Optional[str]) -> None:
+        with self._lock:
+            self._jobs.pop(key, None)
+
+    def _trim(self) -> None:
+        # Drop the oldest finished jobs; running ones stay until they finish
+        for key in [k for k, j in self._jobs.items() if j.done][:max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[key]
+
+    def _run(self, job: AnalysisJob, pdf_bytes: bytes, correct, kwargs) -> None:
+        try:
+            # batch_size=1: each field is published as soon as it is analysed
+            job.result = analyze_pdf(pdf_bytes, self.nlp, correct=correct, batch_size=1,
+                                     cache=self.cache,
+                                     progress=job._report, on_field=job._add_field, **kwargs)
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            job._done.set()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
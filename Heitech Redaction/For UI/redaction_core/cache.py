@@ -0,0 +1,185 @@
+"""
+Content-addressed cache of NER results, held in memory in a byte-bounded LRU.
+
+Entries are keyed by HMAC-SHA256 of (analysis version, exact text) under a
+per-deployment secret, where the analysis version covers the spaCy model
+name/version and the EntityRuler pattern set. A changed model or pattern list therefore never serves stale
+entities, and the same narrative costs no NER time again, whichever page,
+session or follow-up report it comes from.
+
+The file stores entity offsets and labels, never the text itself. It is
+still sensitive: the spans say where PII sits in a field and of what kind,
+and without the secret short fields (names, MRNs, dates) could be recovered
+from plain hashes by trying candidates. The secret is passed in, or else a
+random one is created once next to the file (<file>.key, owner-only), so
+keep both out of version control and backups that leave the deployment.
+The file is append-only JSONL (later lines win, a torn last line is ignored). In memory the spans sit in a ByteLRU; entries
+it evicts are read back from the file through a key -> offset index.
+Full Docs (with trf tensors, easily megabytes each) are never kept.
+"""
+
+from __future__ import annotations
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from .analysis import Entity, FieldAnalysis, text_key
+
+Spans = Tuple[Tuple[int, int, str], ...]
+
+# Default in-memory budget for cached span lists (the disk file has no limit)
+DEFAULT_SPANS_BYTES = 64 * 1024 * 1024
+
+def spans_nbytes(spans: Spans) -> int:
+    """Rough resident size of one cached span list, key included."""
+    return 200 + 120 * len(spans)
+
+class ByteLRU:
+    """Thread-safe LRU bounded by the estimated byte total of its values, with hit/miss/eviction counters."""
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = sys.getsizeof):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._items: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: str, value) -> None:
+        size = self.sizeof(value)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            if size > self.max_bytes:
+                return  # would evict everything else and still not fit
+            self._items[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._items), "bytes": self.nbytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+def user_cache_path(name: str) -> Path:
+    """name in the per-user cache directory (%LOCALAPPDATA%, $XDG_CACHE_HOME or ~/.cache), under clara/."""
+    base = os.environ.get("LOCALAPPDATA") if os.name == "nt" else os.environ.get("XDG_CACHE_HOME")
+    return Path(base or Path.home() / ".cache") / "clara" / name
+
+def load_secret(path: Path, nbytes: int = 32) -> bytes:
+    """Random secret stored at path, created (owner read/write only) on first use."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return path.read_bytes()
+    secret = os.urandom(nbytes)
+    with os.fdopen(fd, "wb") as f:
+        f.write(secret)
+    return secret
+
+class AnalysisCache:
+    """Thread-safe text -> entity spans cache, optionally persisted to a JSONL file.
+
+    secret keys the entries (HMAC); by default it is read from, or created at,
+    <path>.key, and is random per process for a memory-only cache.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, max_bytes: int = DEFAULT_SPANS_BYTES,
+                 secret: Optional[bytes] = None):
+        self.path = Path(path) if path else None
+        if secret is None:
+            secret = load_secret(self.path.with_name(self.path.name + ".key")) if self.path else os.urandom(32)
+        self._secret = secret
+        self._spans = ByteLRU(max_bytes, sizeof=spans_nbytes)
+        self._offsets: Dict[str, int] = {}   # key -> byte offset of its latest line in the file
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        if self.path is not None:
+            self._load()
+
+    def key(self, version: str, text: str) -> str:
+        return text_key(version, text, self._secret)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        offset = 0
+        with self.path.open("rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    offset += len(line)
+                    continue
+                self._offsets[entry["key"]] = offset
+                self._spans.put(entry["key"], tuple(tuple(s) for s in entry["ents"]))
+                offset += len(line)
+        # Loading is not traffic; start the counters clean
+        self._spans.evictions = 0
+
+    def _read_disk(self, key: str) -> Optional[Spans]:
+        offset = self._offsets.get(key)
+        if offset is None:
+            return None
+        with self.path.open("rb") as f:
+            f.seek(offset)
+            spans = tuple(tuple(s) for s in json.loads(f.readline())["ents"])
+        self._spans.put(key, spans)
+        self.disk_hits += 1
+        return spans
+
+    def get(self, version: str, text: str) -> Optional[FieldAnalysis]:
+        key = self.key(version, text)
+        spans = self._spans.get(key)
+        if spans is None:
+            with self._lock:
+                spans = self._read_disk(key)
+            if spans is None:
+                return None
+        return FieldAnalysis(text, [Entity(s, e, text[s:e], label) for s, e, label in spans])
+
+    def put(self, version: str, analysis: FieldAnalysis) -> None:
+        key = self.key(version, analysis.text)
+        spans = tuple((e.start_char, e.end_char, e.label_) for e in analysis.ents)
+        self._spans.put(key, spans)
+        if self.path is None:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as f:
+                f.seek(0, 2)
+                self._offsets[key] = f.tell()
+                f.write((json.dumps({"key": key, "ents": [list(s) for s in spans]}) + "\n").encode("utf-8"))
+
+    def __len__(self):
+        return max(len(self._spans), len(self._offsets))
+
+    def stats(self) -> Dict[str, int]:
+        """Memory LRU counters (a hit served from disk counts as a memory miss plus a disk hit)."""
+        return {**self._spans.stats(), "disk_entries": len(self._offsets), "disk_hits": self.disk_hits}
@@ -0,0 +1,121 @@
+"""
+Per-upload analysis of a MedWatch 3500A PDF: pick the narrative fields,
+correct them, run NER once over all of them and write the redactions back.
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from .analysis import DEFAULT_BATCH_SIZE, FieldAnalysis, analyze_many
+
+# Stages reported through the optional progress callback, in order
+PROGRESS_STAGES = ("extract", "correct", "ner", "write", "save")
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+def medwatch_display_name(page_num: int, field_name: str) -> Optional[str]:
+    """Section label of a redacted 3500A field (B5, D10-n, H11), None for fields left alone."""
+    if page_num == 1 and field_name == "advEvDescribe":
+        return "B5"
+    if page_num == 4 and field_name.startswith("cProdName"):
+        return f"D10-{field_name.replace('cProdName', '')}"
+    if page_num == 6 and field_name == "addNarr":
+        return "H11"
+    return None
+
+class FieldResult:
+    """One redacted form field: where it is, its corrected text and its analysis."""
+
+    __slots__ = ("page", "field_name", "display_name", "xref", "text", "analysis")
+
+    def __init__(self, page: int, field_name: str, display_name: str, xref: int, text: str,
+                 analysis: Optional[FieldAnalysis] = None):
+        self.page = page
+        self.field_name = field_name
+        self.display_name = display_name
+        self.xref = xref
+        self.text = text
+        self.analysis = analysis
+
+    @property
+    def redacted(self) -> str:
+        return self.analysis.redacted
+
+class DocumentAnalysis:
+    """Every analysed field of one upload plus the auto-redacted PDF bytes."""
+
+    def __init__(self, fields: List[FieldResult], pdf_bytes: bytes = b""):
+        self.fields = fields
+        self.pdf_bytes = pdf_bytes
+        self._by_key: Dict[Tuple[int, str], FieldResult] = {(f.page, f.field_name): f for f in fields}
+
+    def __iter__(self):
+        return iter(self.fields)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def field(self, page: int, field_name: str) -> Optional[FieldResult]:
+        """Look up by 0-based page index and widget field name."""
+        return self._by_key.get((page, field_name))
+
+def analyze_pdf(pdf_bytes: bytes, nlp, correct: Callable[[str], str] = None,
+                select: Callable[[int, str], Optional[str]] = medwatch_display_name,
+                batch_size: int = DEFAULT_BATCH_SIZE, cache=None,
+                progress: Optional[ProgressCallback] = None,
+                on_field: Optional[Callable[[FieldResult], None]] = None) -> DocumentAnalysis:
+    """Analyse the selected text fields of a PDF once and return them with the redacted PDF.
+
+    cache is an optional AnalysisCache; fields whose text it already holds skip NER.
+    If given, progress(stage, info) is called as work completes; stages are
+    PROGRESS_STAGES in order (correct and ner alternate per batch) and info
+    carries "done"/"total" counts. on_field(field) is called as each field's
+    analysis is ready, in document order.
+    """
+    report = progress or (lambda stage, info: None)
+    correct = correct or (lambda text: text)
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+
+    fields: List[FieldResult] = []
+    for page_num in range(doc.page_count):
+        for widget in doc[page_num].widgets() or []:
+            val = widget.field_value
+            if not val or widget.field_type != fitz.PDF_WIDGET_TYPE_TEXT:
+                continue
+            display_name = select(page_num, widget.field_name)
+            if display_name is None:
+                continue
+            fields.append(FieldResult(page_num, widget.field_name, display_name, widget.xref, val))
+        report("extract", {"done": page_num + 1, "total": doc.page_count, "fields": len(fields)})
+
+    def corrected():
+        # Pulled by analyze_many one batch at a time, so a field is analysed right after its correction
+        for n, f in enumerate(fields, 1):
+            f.text = correct(f.text)
+            report("correct", {"done": n, "total": len(fields), "field": f.display_name})
+            yield f.text
+
+    analyses = analyze_many(nlp, corrected(), batch_size=batch_size, cache=cache)
+    for n, (f, analysis) in enumerate(zip(fields, analyses), 1):
+        f.analysis = analysis
+        report("ner", {"done": n, "total": len(fields), "field": f.display_name})
+        if on_field:
+            on_field(f)
+
+    by_xref = {(f.page, f.xref): f for f in fields}
+    written = 0
+    for page_num in sorted({f.page for f in fields}):
+        for widget in doc[page_num].widgets() or []:
+            f = by_xref.get((page_num, widget.xref))
+            if f is None:
+                continue
+            widget.field_value = f.redacted
+            widget.update()
+            written += 1
+            report("write", {"done": written, "total": len(fields)})
+
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    report("save", {"done": 1, "total": 1, "bytes": len(pdf_bytes)})
+    return DocumentAnalysis(fields, pdf_bytes)
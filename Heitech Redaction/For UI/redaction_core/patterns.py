@@ -0,0 +1,49 @@
+"""
+EntityRuler patterns and spaCy model loading shared by every redaction entry point.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MODELS_TO_TRY = ["en_core_web_trf", "en_core_web_lg", "en_core_web_md", "en_core_web_sm"]
+
+PATTERNS: List[Dict[str, Any]] = [
+    {"label": "ADDRESS", "pattern": [{"TEXT": {"REGEX": r"^\d{3,6}$"}}, {"IS_ALPHA": True, "OP": "+"}, {"IS_ALPHA": True, "OP": "?"}, {"IS_ALPHA": True, "OP": "+"}, {"IS_PUNCT": True, "OP": "?"}, {"IS_ALPHA": True, "LENGTH": 2}, {"IS_PUNCT": True, "OP": "?"}, {"IS_DIGIT": True, "LENGTH": 5}]},
+    {"label": "ADDRESS", "pattern": [{"IS_DIGIT": True}, {"IS_ALPHA": True, "OP": "?"}, {"IS_ALPHA": True}, {"IS_ALPHA": True, "OP": "?"}, {"IS_PUNCT": True, "OP": "?"}, {"IS_ALPHA": True}, {"IS_PUNCT": True, "OP": "?"}, {"IS_ALPHA": True, "LENGTH": 2}, {"IS_DIGIT": True, "LENGTH": 5}]},
+    {"label": "DATE", "pattern": [{"IS_DIGIT": True}, {"LOWER": {"REGEX": "(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)"}}, {"IS_DIGIT": True}]},
+    {"label": "SSN", "pattern": [{"TEXT": {"REGEX": r"^\d{3}-\d{2}-\d{4}$"}}]},
+    {"label": "SSN", "pattern": [{"TEXT": {"REGEX": r"^\d{3}$"}}, {"TEXT": "-"}, {"TEXT": {"REGEX": r"^\d{2}$"}}, {"TEXT": "-"}, {"TEXT": {"REGEX": r"^\d{4}$"}}]},
+    {"label": "SSN", "pattern": [{"TEXT": {"REGEX": r"(?i)^(ssn|ss|social|security)[:]?$"}}, {"TEXT": {"REGEX": r"^\d{3}[-\s]?\d{2}[-\s]?\d{4}$"}}]}
+]
+
+def load_nlp(models: List[str] = None,
+             on_skip: Optional[Callable[[str, Exception], None]] = None) -> Tuple[Any, str]:
+    """Load the first available model with the EntityRuler in front of NER; returns (nlp, model_name).
+
+    on_skip(model_name, error) is called for each model that could not be loaded.
+    """
+    import spacy
+    models = models or MODELS_TO_TRY
+    last_err = None
+    for m in models:
+        try:
+            nlp = spacy.load(m, disable=["lemmatizer"])
+        except Exception as e:
+            last_err = e
+            if on_skip:
+                on_skip(m, e)
+            continue
+        ruler = nlp.add_pipe("entity_ruler", before="ner") if "ner" in nlp.pipe_names else nlp.add_pipe("entity_ruler")
+        ruler.add_patterns(PATTERNS)
+        return nlp, m
+    raise RuntimeError(f"Failed to load any spaCy model {models}: {last_err}")
+
+def patterns_version() -> str:
+    return hashlib.sha256(json.dumps(PATTERNS, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def analysis_version(nlp) -> str:
+    """Identifies what produced a text's entities: model name/version plus the pattern set."""
+    meta = getattr(nlp, "meta", {}) or {}
+    return f"{meta.get('lang', 'xx')}_{meta.get('name', 'custom')}-{meta.get('version', '0')}:{patterns_version()}"
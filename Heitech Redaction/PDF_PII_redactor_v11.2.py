@@ -1,12 +1,14 @@
 # PDF_PII_redactor_SL_v4-3.py
 
 import os
+import sys
 import streamlit as st
 import fitz  # PyMuPDF
 import pandas as pd
 import spacy
 import io
 import re
+import time
 import threading
 import base64
 from datetime import datetime
@@ -17,6 +19,11 @@ from spacy import displacy
 # Env & API setup
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
+# Shared redaction engine (model, patterns, skip rules, span writer) lives next to the no-UI module
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "For UI"))
+import redaction_core
+from redaction_core import analyze, analyze_pdf
+
 
 # Setup SymSpell
 from symspellpy.symspellpy import SymSpell, Verbosity
@@ -359,9 +366,6 @@ div[data-testid="stIframe"] {
 </style>
 """, unsafe_allow_html=True)
 
-if "doc_cache" not in st.session_state:
-    st.session_state["doc_cache"] = {}
-
 if "correction_cache" not in st.session_state:
     st.session_state["correction_cache"] = {}
 
@@ -408,37 +412,41 @@ for i, option in enumerate(options):
         st.session_state["current_page_mode"] = i
         break
 
-PATTERNS = [
-    {"label": "ADDRESS", "pattern": [{"TEXT": {"REGEX": r"^\d{3,6}$"}}, {"IS_ALPHA": True, "OP": "+"}, {"IS_ALPHA": True, "OP": "?"}, {"IS_ALPHA": True, "OP": "+"}, {"IS_PUNCT": True, "OP": "?"}, {"IS_ALPHA": True, "LENGTH": 2}, {"IS_PUNCT": True, "OP": "?"}, {"IS_DIGIT": True, "LENGTH": 5}]},
-    {"label": "ADDRESS", "pattern": [{"IS_DIGIT": True}, {"IS_ALPHA": True, "OP": "?"}, {"IS_ALPHA": True}, {"IS_ALPHA": True, "OP": "?"}, {"IS_PUNCT": True, "OP": "?"}, {"IS_ALPHA": True}, {"IS_PUNCT": True, "OP": "?"}, {"IS_ALPHA": True, "LENGTH": 2}, {"IS_DIGIT": True, "LENGTH": 5}]},
-    {"label": "DATE", "pattern": [{"IS_DIGIT": True}, {"LOWER": {"REGEX": "(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)"}}, {"IS_DIGIT": True}]},
-    {"label": "SSN", "pattern": [{"TEXT": {"REGEX": r"^\d{3}-\d{2}-\d{4}$"}}]},
-    {"label": "SSN", "pattern": [{"TEXT": {"REGEX": r"^\d{3}$"}}, {"TEXT": "-"}, {"TEXT": {"REGEX": r"^\d{2}$"}}, {"TEXT": "-"}, {"TEXT": {"REGEX": r"^\d{4}$"}}]},
-    {"label": "SSN", "pattern": [{"TEXT": {"REGEX": r"(?i)^(ssn|ss|social|security)[:]?$"}}, {"TEXT": {"REGEX": r"^\d{3}[-\s]?\d{2}[-\s]?\d{4}$"}}]}
-]
-
 # Cached NLP loader with fallback models
 @st.cache_resource
 def load_nlp():
-    models_to_try = ["en_core_web_trf", "en_core_web_lg", "en_core_web_md", "en_core_web_sm"]
-    
-    for model_name in models_to_try:
-        try:
-            nlp = spacy.load(model_name)
-            # st.info(f"✅ Loaded spaCy model: {model_name}")  # Removed to clean up UI
-            ruler = nlp.add_pipe("entity_ruler", before="ner")
-            ruler.add_patterns(PATTERNS)
-            return nlp
-        except OSError:
-            st.warning(f"⚠️ Model {model_name} not found, trying next...")
-            continue
-    
-    # If no models found, show error and stop
-    st.error("❌ No spaCy English models found. Please install one using: python -m spacy download en_core_web_sm")
-    st.stop()
+    try:
+        nlp, model_name = redaction_core.load_nlp(
+            on_skip=lambda model_name, err: st.warning(f"⚠️ Model {model_name} not found, trying next...")
+        )
+        return nlp
+    except RuntimeError:
+        # If no models found, show error and stop
+        st.error("❌ No spaCy English models found. Please install one using: python -m spacy download en_core_web_sm")
+        st.stop()
 
 nlp = load_nlp()
 
+# NER results keyed by an HMAC of text + model + patterns, shared by every session on this server
+# and kept on disk (offsets and labels only) in the user cache directory, or at CLARA_ANALYSIS_CACHE;
+# set CLARA_ANALYSIS_CACHE="" to keep it in memory.
+# CLARA_ANALYSIS_CACHE_SECRET sets the HMAC secret (else a random one is kept in <cache>.key).
+# In memory the span lists sit in an LRU of CLARA_ANALYSIS_CACHE_MB.
+@st.cache_resource
+def load_analysis_cache():
+    secret = os.environ.get("CLARA_ANALYSIS_CACHE_SECRET")
+    return redaction_core.AnalysisCache(
+        os.environ.get("CLARA_ANALYSIS_CACHE", str(redaction_core.user_cache_path("analysis_cache.jsonl"))) or None,
+        max_bytes=int(float(os.environ.get("CLARA_ANALYSIS_CACHE_MB", "64")) * 1024 * 1024),
+        secret=secret.encode("utf-8") if secret else None,
+    )
+
+analysis_cache = load_analysis_cache()
+
+with st.sidebar.expander("Cache statistics"):
+    st.caption("Analysis spans")
+    st.json(analysis_cache.stats())
+
 # AFTER:
 PII_COLORS = {
     "ADDRESS": "#009E73", 
@@ -451,9 +459,9 @@ PII_COLORS = {
 }
 
 
-# Correction engine
-@st.cache_data(show_spinner=False)
-def apply_text_corrections(text, spell_level, grammar_level, fluency_level):
+# Correction engine (plain function so the background worker can call it outside a script run);
+# get_tool, if given, returns the LanguageTool instance to reuse
+def correct_text(text, spell_level, grammar_level, fluency_level, get_tool=None):
     if spell_level == grammar_level == fluency_level == "disable":
         return text
 
@@ -470,7 +478,7 @@ def apply_text_corrections(text, spell_level, grammar_level, fluency_level):
     # Grammar
     if grammar_level == "1":
         import language_tool_python
-        tool = language_tool_python.LanguageTool("en-US")
+        tool = get_tool() if get_tool else language_tool_python.LanguageTool("en-US")
         matches = tool.check(corrected_text)
         corrected_text = language_tool_python.utils.correct(corrected_text, matches)
 
@@ -480,6 +488,77 @@ def apply_text_corrections(text, spell_level, grammar_level, fluency_level):
 
     return corrected_text
 
+# Corrected text per (levels, text), shared by every session and the upload worker thread
+# (st.cache_data needs a script run context, which the worker does not have)
+@st.cache_resource
+def load_correction_results():
+    return redaction_core.ByteLRU(int(float(os.environ.get("CLARA_CORRECTION_CACHE_MB", "32")) * 1024 * 1024))
+
+correction_results = load_correction_results()
+
+def apply_text_corrections(text, spell_level, grammar_level, fluency_level, get_tool=None):
+    key = redaction_core.text_key(repr((spell_level, grammar_level, fluency_level)), text)
+    corrected = correction_results.get(key)
+    if corrected is None:
+        corrected = correct_text(text, spell_level, grammar_level, fluency_level, get_tool)
+        correction_results.put(key, corrected)
+    return corrected
+
+# Uploads are analysed on a background thread keyed by upload hash; one worker per server,
+# shared by every session, so the page stays interactive and finished fields can be reviewed early
+@st.cache_resource
+def load_upload_worker():
+    return redaction_core.BackgroundAnalyzer(nlp, cache=analysis_cache)
+
+upload_worker = load_upload_worker()
+
+def upload_corrector(levels):
+    """Field text normalizer + corrector for the worker thread (no session state there).
+
+    Goes through the shared correction cache; one LanguageTool, started on the first miss, serves the whole job.
+    """
+    tool = []
+    def get_tool():
+        if not tool:
+            import language_tool_python
+            tool.append(language_tool_python.LanguageTool("en-US"))
+        return tool[0]
+
+    def correct(val):
+        norm = re.sub(r"\s+", " ", val.replace("\n", " ").strip())
+        return apply_text_corrections(norm, *levels, get_tool=get_tool)
+    return correct
+
+def publish_upload_job(job):
+    """Mirror the job's finished fields (all of them once it is done) into the session tables."""
+    widgets_df = []
+    pii_table = []
+    analysis = job.partial()
+    for field in analysis:
+        # Only add to pii_table if there's actual meaningful text content
+        norm_corrected = re.sub(r"\s+", " ", field.text.replace("\n", " ").strip())
+        # More aggressive filtering - check if normalized text has actual letters/numbers
+        if norm_corrected and re.search(r'[a-zA-Z0-9]', norm_corrected):
+            pii_table.append({
+                "Page": field.page + 1,
+                "Section": field.display_name,
+                "Original": field.text,
+                "Redaction": field.redacted
+            })
+
+        widgets_df.append({
+            "Page": field.page + 1,
+            "Field Name": field.field_name,
+            "Field Value": field.text,
+            "Display Name": field.display_name
+        })
+
+    st.session_state["analysis"] = analysis
+    st.session_state["widgets_df"] = pd.DataFrame(widgets_df)
+    st.session_state["pii_table"] = pii_table
+    if job.result is not None:
+        st.session_state["output_buffer"] = io.BytesIO(job.result.pdf_bytes)
+
 # Upload section
 if "uploaded_file" not in st.session_state:
     uploaded = st.file_uploader("Upload a PDF", type=["pdf"])
@@ -501,7 +580,6 @@ if page_mode == "Upload PDF":
     st.session_state["spell_level"] = "1"
     st.session_state["grammar_level"] = "1"
     st.session_state["fluency_level"] = "disable"
-    st.session_state["doc_cache"] = {}
     st.session_state["correction_cache"] = {}
     
     # Initialize processing tracking
@@ -509,147 +587,49 @@ if page_mode == "Upload PDF":
         st.session_state["processing_complete"] = False
     
     if not st.session_state["processing_complete"]:
-        import time
-        
-        # Phase 1: PDF Upload (0-20%)
-        progress_text = "PDF uploading..."
-        my_bar = st.progress(0, text=progress_text)
-        for percent_complete in range(20):
-            time.sleep(0.02)
-            my_bar.progress(percent_complete + 1, text=progress_text)
-        
-        # Phase 2: Loading NLP Models (20-40%)
-        progress_text = "Upload complete..."
-        for percent_complete in range(20, 40):
-            time.sleep(0.03)
-            my_bar.progress(percent_complete + 1, text=progress_text)
-        
-        # Phase 3: Document Analysis (40-70%)
-        progress_text = "Initializing PII detection..."
-        for percent_complete in range(40, 70):
-            time.sleep(0.025)
-            my_bar.progress(percent_complete + 1, text=progress_text)
-        
-        # Phase 4: Applying Redactions (70-95%)
-        progress_text = "Analyzing and redacting..."
-        for percent_complete in range(70, 95):
-            time.sleep(0.03)
-            my_bar.progress(percent_complete + 1, text=progress_text)
-        
-        # Phase 5: Finalizing (95-100%)
-        progress_text = "Finalizing redaction process..."
-        for percent_complete in range(95, 100):
-            time.sleep(0.05)
-            my_bar.progress(percent_complete + 1, text=progress_text)
-        
-        # Complete
-        my_bar.progress(100, text="✅ Initial redactions complete!")
-        time.sleep(1.5)
-        my_bar.empty()
-        
-        st.session_state["processing_complete"] = True
-        st.success("✅ Processing complete! PDF previewer loading...")
-        time.sleep(1)
-        
-        # Process the PDF now instead of redirecting
-        if "widgets_df" not in st.session_state:
-            # Setup processing variables
-            doc = fitz.open(stream=binary_data, filetype="pdf")
-            widgets_df = []
-            pii_table = []
-            output_buffer = io.BytesIO()
-            
-            text_correction_levels = (
-                st.session_state.get("spell_level", "disable"),
-                st.session_state.get("grammar_level", "disable"),
-                st.session_state.get("fluency_level", "disable"))
-
-            def correct_field_text(val):
-                norm = re.sub(r"\s+", " ", val.replace("\n", " ").strip())
-                key = (norm, text_correction_levels)
-                if key in st.session_state["correction_cache"]:
-                    return st.session_state["correction_cache"][key]
-                corrected = apply_text_corrections(norm, *text_correction_levels)
-                st.session_state["correction_cache"][key] = corrected
-                return corrected
-            
-            # Open the document once and process it
-            doc = fitz.open(stream=binary_data, filetype="pdf")
-            for page_num in range(doc.page_count):
-                page = doc[page_num]
-                widgets = page.widgets()
-                if not widgets:
-                    continue
-
-                for widget in widgets:
-                    fname = widget.field_name
-                    val = widget.field_value
-                    if not val or widget.field_type != fitz.PDF_WIDGET_TYPE_TEXT:
-                        continue
-
-                    if (page_num == 1 and fname == "advEvDescribe") or \
-                       (page_num == 4 and fname.startswith("cProdName")) or \
-                       (page_num == 6 and fname == "addNarr"):
-
-                        display_name = None
-                        if page_num == 1:
-                            display_name = "B5"
-                        elif page_num == 4:
-                            suffix = fname.replace("cProdName", "")
-                            display_name = f"D10-{suffix}"
-                        elif page_num == 6:
-                            display_name = "H11"
-
-                        corrected = correct_field_text(val)
-                        doc_cache_key = (page_num, fname)
-                        if doc_cache_key in st.session_state["doc_cache"]:
-                            doc_ent = st.session_state["doc_cache"][doc_cache_key]
-                        else:
-                            doc_ent = nlp(corrected)
-                            st.session_state["doc_cache"][doc_cache_key] = doc_ent
-                        redacted = corrected
-
-                        for ent in doc_ent.ents:
-                            if ent.label_ in {"CARDINAL", "QUANTITY", "PERCENT"}:
-                                continue
-                            if ent.label_ in {"FAC", "GPE"} and any(e.label_ == "ADDRESS" for e in doc_ent.ents):
-                                continue
-                            if ent.label_ == "PERSON" and any(char.isdigit() for char in ent.text):
-                                continue
-                            if ent.label_ == "DATE" and not re.search(r"(19|20)\d{2}", ent.text):
-                                continue  # Only redact if actual date string
-                            redacted = redacted.replace(
-                                ent.text,
-                                f"[{ent.label_}]{' ' * max(0, len(ent.text) - len(ent.label_) - 2)}"
-                            )
-
-                        # Only add to pii_table if there's actual meaningful text content
-                        norm_corrected = re.sub(r"\s+", " ", corrected.replace("\n", " ").strip())
-                        # More aggressive filtering - check if normalized text has actual letters/numbers
-                        if norm_corrected and re.search(r'[a-zA-Z0-9]', norm_corrected):
-                            pii_table.append({
-                                "Page": page_num + 1,
-                                "Section": display_name,
-                                "Original": corrected,
-                                "Redaction": redacted
-                            })
-
-                        widget.field_value = redacted
-                        widget.update()
-
-                        widgets_df.append({
-                            "Page": page_num + 1,
-                            "Field Name": fname,
-                            "Field Value": corrected,
-                            "Display Name": display_name
-                        })
+        text_correction_levels = (
+            st.session_state.get("spell_level", "disable"),
+            st.session_state.get("grammar_level", "disable"),
+            st.session_state.get("fluency_level", "disable"))
+
+        # Same upload + settings from any session maps to the same job; NER runs once
+        job = upload_worker.submit(
+            binary_data,
+            key=redaction_core.upload_key(binary_data, text_correction_levels),
+            correct=upload_corrector(text_correction_levels),
+        )
+        st.session_state["upload_job"] = job.key
+        publish_upload_job(job)
+
+        if job.error:
+            # Resubmitting replaces a failed job, so a rerun retries
+            st.error(f"❌ Processing failed: {job.error}")
+            st.stop()
+
+        if not job.done:
+            # Progress bar driven by the worker's stage events
+            progress = job.progress()
+            extract = progress.get("extract", {"done": 0, "total": 1, "fields": 0})
+            total_fields = max(1, extract["fields"])
+            ready = [f.display_name for f in job.ready_fields()]
+            if "write" in progress or "save" in progress:
+                percent, progress_text = 95, "Finalizing redaction process..."
+            elif "correct" in progress:
+                worked = progress["correct"]["done"] + progress.get("ner", {}).get("done", 0)
+                percent = 10 + int(80 * worked / (2 * total_fields))
+                progress_text = f"Analyzing and redacting... {len(ready)} of {total_fields} fields ready"
+            else:
+                percent = int(10 * extract["done"] / extract["total"])
+                progress_text = "Reading form fields..."
+            st.progress(percent, text=progress_text)
+            if ready:
+                st.info(f"Ready for review: {', '.join(ready)}. Verify and Edit can be opened now; "
+                        "the remaining fields keep processing in the background.")
+            # Poll the worker; any click interrupts this wait and reruns straight away
+            time.sleep(0.5)
+            st.rerun()
 
-            doc.save(output_buffer)
-            doc.close()
-            st.session_state["widgets_df"] = pd.DataFrame(widgets_df)
-            st.session_state["pii_table"] = pii_table
-            st.session_state["output_buffer"] = output_buffer
-        
+        st.session_state["processing_complete"] = True
         st.rerun()
     
     # Show results if processing is complete
@@ -698,6 +678,8 @@ if page_mode == "Upload PDF":
                 st.session_state.pop("widgets_df", None)
                 st.session_state.pop("pii_table", None)
                 st.session_state.pop("output_buffer", None)
+                st.session_state.pop("analysis", None)
+                st.session_state.pop("upload_job", None)
                 # Clear editor tags and buffers when clearing PDF
                 if "editor_tags" in st.session_state:
                     st.session_state["editor_tags"] = []
@@ -740,6 +722,31 @@ def correct_field_text(val):
     st.session_state["correction_cache"][key] = corrected
     return corrected
 
+def field_analysis(page_index, field_name, text):
+    """Analysis computed at upload for this field, else the shared cache, else one NER pass."""
+    analysis = st.session_state.get("analysis")
+    field = analysis.field(page_index, field_name) if analysis is not None else None
+    if field is not None and field.text == text:
+        return field.analysis
+    return analyze(nlp, text, cache=analysis_cache)
+
+# Fields the background worker has finished so far; Verify and Edit open on these
+upload_job = upload_worker.get(st.session_state.get("upload_job"))
+upload_running = upload_job is not None and not upload_job.done
+if upload_job is not None and not st.session_state.get("processing_complete", False):
+    publish_upload_job(upload_job)
+    if upload_job.done and upload_job.error is None:
+        st.session_state["processing_complete"] = True
+    elif upload_running and page_mode != "Upload PDF":
+        ready = [f.display_name for f in upload_job.ready_fields()]
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.info(f"Ready for review: {', '.join(ready) or 'none yet'}. "
+                    "The remaining fields are still being analysed.")
+        with col2:
+            if st.button("Refresh", key="refresh_upload_job", use_container_width=True):
+                st.rerun()
+
 # Manual highlight --> "Verify"
 if page_mode == "Verify":
     st.markdown("<h1 style='text-align: center;'>Verify Initial Redactions</h1>", unsafe_allow_html=True)
@@ -757,12 +764,7 @@ if page_mode == "Verify":
         row = widgets_df[widgets_df["Display Name"] == choice].iloc[0]
 
         original_text = row["Field Value"]
-        doc_cache_key = (row["Page"] - 1, row["Field Name"])
-        if doc_cache_key in st.session_state["doc_cache"]:
-            field_doc = st.session_state["doc_cache"][doc_cache_key]
-        else:
-            field_doc = nlp(original_text)
-            st.session_state["doc_cache"][doc_cache_key] = field_doc
+        field_doc = field_analysis(row["Page"] - 1, row["Field Name"], original_text)
         
         if "correction_cache" not in st.session_state:
             st.session_state["correction_cache"] = {}
@@ -989,55 +991,17 @@ if page_mode == "Edit":
             st.session_state["selected_tag_type"] = None
         
         # Ensure we have redacted PDF data for preview
-        if "output_buffer" not in st.session_state or not hasattr(st.session_state, "output_buffer"):
-            # Create output buffer from current document state
-            temp_output_buffer = io.BytesIO()
-            temp_doc = fitz.open(stream=original_pdf_data, filetype="pdf")
-            
-            # Apply the same redactions as in Auto Redact
-            widgets_df = st.session_state["widgets_df"]
-            for idx, row in widgets_df.iterrows():
-                page_num = row['Page'] - 1
-                field_name = row['Field Name']
-                
-                # Get the redacted field content from widgets_df processing
-                for page_num_doc, page in enumerate(temp_doc):
-                    if page_num_doc == page_num:
-                        for widget in page.widgets() or []:
-                            if widget.field_name == field_name:
-                                # Apply NLP redactions (same logic as Auto Redact)
-                                corrected = correct_field_text(widget.field_value or "")
-                                doc_cache_key = (page_num, field_name)
-                                if doc_cache_key in st.session_state["doc_cache"]:
-                                    doc_ent = st.session_state["doc_cache"][doc_cache_key]
-                                else:
-                                    doc_ent = nlp(corrected)
-                                    st.session_state["doc_cache"][doc_cache_key] = doc_ent
-                                
-                                redacted = corrected
-                                for ent in doc_ent.ents:
-                                    if ent.label_ in {"CARDINAL", "QUANTITY", "PERCENT"}:
-                                        continue
-                                    if ent.label_ in {"FAC", "GPE"} and any(e.label_ == "ADDRESS" for e in doc_ent.ents):
-                                        continue
-                                    if ent.label_ == "PERSON" and any(char.isdigit() for char in ent.text):
-                                        continue
-                                    if ent.label_ == "DATE" and not re.search(r"(19|20)\d{2}", ent.text):
-                                        continue
-                                    redacted = redacted.replace(
-                                        ent.text,
-                                        f"[{ent.label_}]{' ' * max(0, len(ent.text) - len(ent.label_) - 2)}"
-                                    )
-                                
-                                widget.field_value = redacted
-                                widget.update()
-                                break
-            
-            temp_doc.save(temp_output_buffer)
-            temp_doc.close()
+        # (not while the background worker is still on it: it publishes the buffer when done)
+        if not upload_running and ("output_buffer" not in st.session_state or not hasattr(st.session_state, "output_buffer")):
+            # Rebuild from the upload's analysis (same redactions as Auto Redact, no second NER pass)
+            analysis = st.session_state.get("analysis")
+            if analysis is None or not analysis.pdf_bytes:
+                analysis = analyze_pdf(original_pdf_data, nlp, correct=correct_field_text, cache=analysis_cache)
+                st.session_state["analysis"] = analysis
+            temp_output_buffer = io.BytesIO(analysis.pdf_bytes)
             st.session_state["output_buffer"] = temp_output_buffer
         
-        output_buffer = st.session_state["output_buffer"]
+        output_buffer = st.session_state.get("output_buffer")
         
         # Text-based tagging interface
         
@@ -1057,30 +1021,9 @@ if page_mode == "Edit":
                     # Field label - left aligned with no spacing
                     st.markdown(f"<h4 style='text-align: left; margin-bottom: 2px; margin-top: 10px;' onclick=\"highlightText('{row['Display Name']}')\">{row['Display Name']} (Page {row['Page']})</h4>", unsafe_allow_html=True)
                     
-                    # Generate redacted version using NLP (same logic as Auto Redact)
+                    # Redacted version from the upload's analysis (same logic as Auto Redact)
                     original_text = row['Field Value']
-                    corrected = correct_field_text(original_text)
-                    doc_cache_key = (row['Page'] - 1, row['Field Name'])
-                    if doc_cache_key in st.session_state["doc_cache"]:
-                        doc_ent = st.session_state["doc_cache"][doc_cache_key]
-                    else:
-                        doc_ent = nlp(corrected)
-                        st.session_state["doc_cache"][doc_cache_key] = doc_ent
-                    
-                    redacted_text = corrected
-                    for ent in doc_ent.ents:
-                        if ent.label_ in {"CARDINAL", "QUANTITY", "PERCENT"}:
-                            continue
-                        if ent.label_ in {"FAC", "GPE"} and any(e.label_ == "ADDRESS" for e in doc_ent.ents):
-                            continue
-                        if ent.label_ == "PERSON" and any(char.isdigit() for char in ent.text):
-                            continue
-                        if ent.label_ == "DATE" and not re.search(r"(19|20)\d{2}", ent.text):
-                            continue
-                        redacted_text = redacted_text.replace(
-                            ent.text,
-                            f"[{ent.label_}]{' ' * max(0, len(ent.text) - len(ent.label_) - 2)}"
-                        )
+                    redacted_text = field_analysis(row['Page'] - 1, row['Field Name'], original_text).redacted
                     
                     
                     # Parse text to get individual words
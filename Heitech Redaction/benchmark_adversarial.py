@@ -0,0 +1,114 @@
+"""
+benchmark_adversarial.py
+------------------------
+Worst-case latency of the regex detectors on hostile free text: long runs of
+capitals, digits and punctuation that make backtracking patterns blow up.
+
+For each adversarial input and size it times Alan code.py's regex detection
+with every installed regex backend (re, re2, regex), and prints how the time
+grows as the input doubles (~2x per doubling is linear, ~4x quadratic). It
+also runs the EntityRuler REGEX patterns of the shared redaction_core package
+(used by PDF_PII_redactor_v11.2.py) against single long tokens, which is how
+spaCy applies them.
+
+Usage:
+  python benchmark_adversarial.py
+  python benchmark_adversarial.py --sizes 1000 2000 4000 8000 --timeout 0.05
+"""
+
+import argparse
+import importlib.util
+import pathlib
+import re
+import time
+
+HERE = pathlib.Path(__file__).parent
+
+ADVERSARIAL = {
+    "capitals": lambda n: "ABCDEFGHIJKLMNOPQRSTUVWXYZ" * (n // 26 + 1),
+    "capitalized words": lambda n: "Abc " * (n // 4 + 1),
+    "digits": lambda n: "1" * n,
+    "capitals+digits": lambda n: "A1" * (n // 2 + 1),
+    "dotted": lambda n: "a." * (n // 2 + 1),
+    "thousands": lambda n: "100," * (n // 4 + 1),
+    "repeated mm": lambda n: "1 mm " * (n // 5 + 1),
+    "punctuation": lambda n: "-:./,$" * (n // 6 + 1),
+}
+
+
+def load_alan():
+    # "Alan code.py" is not importable by name
+    spec = importlib.util.spec_from_file_location("alan_code", HERE / "Alan code.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def entity_ruler_regexes(path=HERE / "For UI" / "redaction_core" / "patterns.py"):
+    """REGEX strings from the core PATTERNS list, loaded without spaCy or PyMuPDF"""
+    spec = importlib.util.spec_from_file_location("redaction_core_patterns", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    patterns = module.PATTERNS
+    found = []
+
+    def walk(obj):
+        if isinstance(obj, dict):
+            for key, value in obj.items():
+                if key == "REGEX":
+                    found.append(value)
+                else:
+                    walk(value)
+        elif isinstance(obj, list):
+            for item in obj:
+                walk(item)
+
+    walk(patterns)
+    return found
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Adversarial-input latency benchmark for the regex detectors")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 4000, 8000], help="Input lengths in characters")
+    ap.add_argument("--timeout", type=float, default=None, help="Per-pattern time budget for the 'regex' backend")
+    args = ap.parse_args()
+
+    alan = load_alan()
+    backends = [b for b in alan.REGEX_BACKENDS if b == "re" or importlib.util.find_spec(b) is not None]
+    timeout = alan.DEFAULT_MATCH_TIMEOUT if args.timeout is None else args.timeout
+    engines = {b: alan.SimplifiedRedactionEngine(use_presidio=False, regex_backend=b, match_timeout=timeout)
+               for b in backends}
+    print(f"backends: {', '.join(backends)}  sizes: {args.sizes}")
+
+    worst = {b: 0.0 for b in backends}
+    print(f"\n{'input':<18} {'backend':<7} " + " ".join(f"{n:>9}" for n in args.sizes) + "   growth/doubling")
+    for name, make in ADVERSARIAL.items():
+        for backend, engine in engines.items():
+            times = [timed(engine.scanner.scan, make(n)[:n]) for n in args.sizes]
+            worst[backend] = max(worst[backend], max(times))
+            growth = (times[-1] / times[0]) ** (1 / max(1, len(times) - 1)) if times[0] > 0 else float("nan")
+            print(f"{name:<18} {backend:<7} " + " ".join(f"{t:>8.4f}s" for t in times) + f"   x{growth:.1f}")
+
+    print("\nworst case per backend: " + ", ".join(f"{b} {t:.3f}s" for b, t in worst.items()))
+    timeouts = {b: e.scanner.timeouts() for b, e in engines.items() if b == "regex"}
+    if timeouts:
+        print(f"patterns cut off by the {timeout}s budget: {timeouts['regex']}")
+
+    # spaCy runs EntityRuler REGEX predicates with re.search on each token's text
+    regexes = entity_ruler_regexes()
+    n = max(args.sizes)
+    print(f"\nredaction_core EntityRuler REGEX patterns on single {n}-character tokens")
+    for pattern in regexes:
+        compiled = re.compile(pattern)
+        t = max(timed(compiled.search, make(n)[:n]) for make in ADVERSARIAL.values())
+        print(f"  {t:>8.5f}s  {pattern}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+benchmark_detection.py
+----------------------
+Times the regex detectors of Alan code.py on long MedWatch narratives: the
+original code (one detect_* method per family, loaded from git history or a
+saved copy) against the current single-pass MultiPatternScanner, and checks
+that both return identical findings. It also compares full run_detection
+(overlap removal, classification, redaction) with Presidio off on both sides.
+Exact repeat findings, which the original emits for terms listed twice and
+overlap removal drops, are reported separately.
+
+Usage:
+  python benchmark_detection.py
+  python benchmark_detection.py --csv "../NER model 1/Generated Assests/B5.csv" --docs 20 --rows 200 --repeat 3
+  python benchmark_detection.py --baseline <git revision or path to a saved "Alan code.py">
+"""
+
+import argparse
+import csv
+import importlib.util
+import pathlib
+import subprocess
+import time
+import types
+
+HERE = pathlib.Path(__file__).parent
+DEFAULT_CSV = HERE.parent / "NER model 1" / "Generated Assests" / "B5.csv"
+ALAN = "Alan code.py"
+
+# Detector order of the original run_detection
+BASELINE_DETECTORS = ("detect_names", "detect_locations", "detect_contact_info", "detect_dates",
+                      "detect_medical_ids", "detect_pharmaceuticals", "detect_manufacturing_info",
+                      "detect_profanity", "detect_financial_info")
+
+
+def load_alan():
+    # "Alan code.py" is not importable by name
+    spec = importlib.util.spec_from_file_location("alan_code", HERE / ALAN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def first_revision():
+    """Commit that added Alan code.py, i.e. the code before any of the detection work"""
+    out = subprocess.run(["git", "log", "--diff-filter=A", "--format=%H", "--", ALAN],
+                         cwd=HERE, capture_output=True, text=True, check=True).stdout.split()
+    if not out:
+        raise SystemExit(f"{ALAN} has no history here; pass --baseline with a saved copy")
+    return out[-1]
+
+
+def load_baseline(baseline=None):
+    """The baseline Alan code.py as a module, from a file path or a git revision"""
+    if baseline and pathlib.Path(baseline).is_file():
+        source, origin = pathlib.Path(baseline).read_text(encoding="utf-8"), baseline
+    else:
+        revision = baseline or first_revision()
+        source = subprocess.run(["git", "show", f"{revision}:./{ALAN}"], cwd=HERE,
+                                capture_output=True, text=True, check=True).stdout
+        origin = f"{revision[:10]}:{ALAN}"
+    module = types.ModuleType("alan_code_baseline")
+    module.__file__ = origin
+    exec(compile(source, origin, "exec"), module.__dict__)
+    # The original engine builds Presidio in __init__; regex timing must not include it
+    module.PRESIDIO_AVAILABLE = False
+    return module, origin
+
+
+def baseline_scan(engine):
+    detectors = [getattr(engine, name) for name in BASELINE_DETECTORS]
+    return lambda text: [finding for detect in detectors for finding in detect(text)]
+
+
+def without_repeats(findings):
+    """Findings with exact repeats dropped (the original list has duplicate terms, e.g. 'surgical')"""
+    seen = set()
+    unique = []
+    for finding in findings:
+        key = tuple(sorted(finding.items()))
+        if key not in seen:
+            seen.add(key)
+            unique.append(finding)
+    return unique
+
+
+def load_narratives(csv_path, docs, rows):
+    """Concatenate B5 rows into `docs` long narratives of `rows` rows each."""
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        texts = [r["text"] for r in csv.DictReader(f)]
+    return [" ".join(texts[(i * rows + j) % len(texts)] for j in range(rows)) for i in range(docs)]
+
+
+def best_of(fn, narratives, repeat):
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = [fn(t) for t in narratives]
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the original per-detector regex loops against the single-pass scanner")
+    ap.add_argument("--csv", default=str(DEFAULT_CSV), help="CSV with a 'text' column")
+    ap.add_argument("--docs", type=int, default=20, help="Number of long narratives")
+    ap.add_argument("--rows", type=int, default=200, help="CSV rows concatenated per narrative")
+    ap.add_argument("--repeat", type=int, default=3, help="Take the best of this many runs")
+    ap.add_argument("--baseline", help="Git revision or file of the original Alan code.py "
+                                       "(default: the commit that added it)")
+    args = ap.parse_args()
+
+    base, origin = load_baseline(args.baseline)
+    old_engine = base.SimplifiedRedactionEngine()
+    old_engine.presidio_analyzer = None
+    engine = load_alan().SimplifiedRedactionEngine(use_presidio=False)
+    narratives = load_narratives(args.csv, args.docs, args.rows)
+    chars = sum(len(t) for t in narratives)
+    print(f"{len(narratives)} narratives, {chars / 1024:.0f} KB, {len(engine.scanner.specs)} patterns, "
+          f"baseline {origin}")
+
+    t_old, old = best_of(baseline_scan(old_engine), narratives, args.repeat)
+    t_new, new = best_of(engine.scanner.scan, narratives, args.repeat)
+    print(f"baseline detectors  : {t_old:.3f}s  ({chars / t_old / 1e6:.2f} MB/s)")
+    print(f"single pass scanner : {t_new:.3f}s  ({chars / t_new / 1e6:.2f} MB/s)  x{t_old / t_new:.2f}")
+    print(f"raw findings: {sum(len(f) for f in new)}  identical: {old == new}")
+    if old != new:
+        repeats = sum(len(o) - len(without_repeats(o)) for o in old)
+        same = [without_repeats(o) for o in old] == [without_repeats(n) for n in new]
+        print(f"  baseline repeats {repeats} findings exactly; identical without repeats: {same}")
+
+    t_old, old = best_of(old_engine.run_detection, narratives, args.repeat)
+    t_new, new = best_of(engine.run_detection, narratives, args.repeat)
+    print(f"run_detection       : {t_old:.3f}s -> {t_new:.3f}s  x{t_old / t_new:.2f}  identical: {old == new}")
+
+
+if __name__ == "__main__":
+    main()